@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Módulos de apoio da Análise Criminal de Chicago (Trabalho Final EBAC).
+
+Os nomes abaixo são importados sob demanda: ``import analise_criminal`` não
+carrega pandas, seaborn, openpyxl nem fpdf até que algo seja usado.
+"""
+
+import importlib
+
+_EXPORTADOS = {
+    "carregar_dados_csv": "analise_criminal.ingestao",
+    "ler_csv_em_blocos": "analise_criminal.ingestao",
+    "Configuracao": "analise_criminal.configuracao",
+    "configuracao_padrao": "analise_criminal.configuracao",
+    "ETAPAS": "analise_criminal.pipeline",
+    "executar": "analise_criminal.pipeline",
+    "carregar_dados": "analise_criminal.etapas",
+    "cruzar_dados": "analise_criminal.etapas",
+    "analise_completa": "analise_criminal.etapas",
+    "analise_exploratoria": "analise_criminal.etapas",
+    "gerar_projecao_criminalidade": "analise_criminal.etapas",
+    "gerar_relatorio_pdf_completo": "analise_criminal.etapas",
+}
+
+__all__ = list(_EXPORTADOS)
+
+
+def __getattr__(nome):
+    if nome in _EXPORTADOS:
+        valor = getattr(importlib.import_module(_EXPORTADOS[nome]), nome)
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
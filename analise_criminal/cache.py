@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Cache colunar (Parquet) para os DataFrames carregados e cruzados.
+
+Cada entrada é identificada por uma chave derivada do conteúdo dos arquivos
+de origem, da versão do carregador e das chaves das entradas das quais ela
+depende. Assim, ``merged`` é invalidado automaticamente quando qualquer uma
+das planilhas (ou o CSV bruto) muda. Nas execuções seguintes os arquivos são
+lidos com memory-map pelo pyarrow, sem passar pelo parser do Excel.
+
+O tamanho total da pasta é limitado: ao ultrapassar ``limite_bytes`` as
+entradas usadas há mais tempo são removidas.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - o cache apenas fica desativado
+    pa = pq = None
+
+# Incrementar sempre que a forma dos DataFrames gerados pelo carregador mudar
+VERSAO_CARREGADOR = "4"
+
+LIMITE_PADRAO = 2 * 1024 ** 3  # 2 GB
+_BLOCO_HASH = 1024 * 1024
+_MANIFESTO = "manifesto_hashes.json"
+
+
+def _normalizar(df):
+    """Converte colunas ``object`` com tipos misturados para texto.
+
+    O ``fillna`` com "Não informado" em colunas numéricas produz colunas que
+    o Parquet não aceita; a mesma conversão é aplicada na execução a frio e
+    na leitura do cache, para que os dois caminhos devolvam os mesmos dtypes.
+    """
+    for coluna in df.columns:
+        if df[coluna].dtype == object:
+            tipos = df[coluna].dropna().map(type).unique()
+            if len(tipos) > 1:
+                df[coluna] = df[coluna].astype(str)
+    return df
+
+
+def atualizar_hash(h, dados):
+    """Alimenta o hash ``h`` com o conteúdo de DataFrames, Series ou dicionários deles."""
+    if isinstance(dados, dict):
+        for chave in sorted(dados):
+            h.update(str(chave).encode())
+            atualizar_hash(h, dados[chave])
+    elif isinstance(dados, (pd.DataFrame, pd.Series)):
+        df = dados.to_frame() if isinstance(dados, pd.Series) else dados
+        h.update(repr(list(df.columns)).encode())
+        h.update(repr([str(t) for t in df.dtypes]).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    else:
+        h.update(repr(dados).encode())
+
+
+def hash_dados(dados):
+    h = hashlib.sha256()
+    atualizar_hash(h, dados)
+    return h.hexdigest()
+
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(_BLOCO_HASH), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+class CacheColunar:
+    def __init__(self, pasta, limite_bytes=LIMITE_PADRAO, versao=VERSAO_CARREGADOR, ativo=True):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.versao = versao
+        self.chaves = {}
+        # Etapas independentes do pipeline podem usar o cache em paralelo (threads)
+        self._trava = threading.RLock()
+        self._travas_arquivos = {}
+        self.ativo = ativo and pq is not None
+        if not self.ativo:
+            if ativo:
+                logging.warning("⚠️ pyarrow não instalado: cache colunar desativado")
+            return
+        os.makedirs(pasta, exist_ok=True)
+        self._caminho_manifesto = os.path.join(pasta, _MANIFESTO)
+        self._manifesto = self._ler_manifesto()
+
+    # --------------------------------------------------
+    # Hash dos arquivos de origem
+    # --------------------------------------------------
+    def _ler_manifesto(self):
+        try:
+            with open(self._caminho_manifesto, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _gravar_manifesto(self):
+        with open(self._caminho_manifesto, "w", encoding="utf-8") as f:
+            json.dump(self._manifesto, f, indent=2)
+
+    def hash_arquivo(self, caminho):
+        """SHA-256 do conteúdo do arquivo.
+
+        O hash fica registrado no manifesto junto com tamanho e mtime; se os
+        dois não mudaram, o arquivo não é relido.
+        """
+        if not self.ativo:
+            return hash_arquivo(caminho)
+        caminho = os.path.abspath(caminho)
+        # Uma trava por arquivo: etapas paralelas que pedem o hash do mesmo
+        # CSV esperam a primeira leitura em vez de relê-lo ao mesmo tempo
+        with self._trava:
+            trava_arquivo = self._travas_arquivos.setdefault(caminho, threading.Lock())
+
+        with trava_arquivo:
+            info = os.stat(caminho)
+            with self._trava:
+                registro = self._manifesto.get(caminho)
+            if registro and registro["tamanho"] == info.st_size and registro["mtime_ns"] == info.st_mtime_ns:
+                return registro["sha256"]
+
+            sha256 = hash_arquivo(caminho)
+            with self._trava:
+                self._manifesto[caminho] = {
+                    "tamanho": info.st_size,
+                    "mtime_ns": info.st_mtime_ns,
+                    "sha256": sha256,
+                }
+                self._gravar_manifesto()
+            return sha256
+
+    def _chave(self, nome, fontes, dependencias, assinatura):
+        h = hashlib.sha256()
+        h.update(f"{nome}|{self.versao}".encode())
+        if assinatura:
+            h.update(f"|{assinatura}".encode())
+        for caminho in fontes:
+            h.update(self.hash_arquivo(caminho).encode())
+        for dep in dependencias:
+            chave_dep = self.chaves.get(dep)
+            if chave_dep is None:
+                raise KeyError(f"Dependência '{dep}' ainda não foi carregada pelo cache")
+            h.update(chave_dep.encode())
+        return h.hexdigest()[:20]
+
+    # --------------------------------------------------
+    # Leitura / gravação
+    # --------------------------------------------------
+    def _caminho(self, nome, chave):
+        return os.path.join(self.pasta, f"{nome}-{chave}.parquet")
+
+    def _ler(self, caminho):
+        tabela = pq.read_table(caminho, memory_map=True)
+        os.utime(caminho)  # marca como usado recentemente para a remoção LRU
+        return tabela.to_pandas()
+
+    def _gravar(self, df, caminho):
+        temporario = caminho + ".tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), temporario)
+        os.replace(temporario, caminho)
+
+    def _remover_antigos(self):
+        arquivos = [
+            os.path.join(self.pasta, nome)
+            for nome in os.listdir(self.pasta)
+            if nome.endswith(".parquet")
+        ]
+        arquivos.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(a) for a in arquivos)
+        while arquivos and total > self.limite_bytes:
+            antigo = arquivos.pop(0)
+            total -= os.path.getsize(antigo)
+            os.remove(antigo)
+            logging.info(f"🧹 Cache removido: {os.path.basename(antigo)}")
+
+    def obter_varios(self, nomes, calcular, fontes=(), dependencias=(), assinatura=None):
+        """Devolve os DataFrames ``nomes``, lendo do cache ou chamando ``calcular``.
+
+        ``calcular`` deve retornar um DataFrame por nome, na mesma ordem.
+        ``fontes`` são caminhos de arquivos cujo conteúdo entra na chave,
+        ``dependencias`` são nomes de entradas obtidas antes por este cache e
+        ``assinatura`` é um texto extra (por exemplo, o hash de um estado
+        incremental) para dados que não vêm diretamente de um arquivo.
+        """
+        if not self.ativo:
+            resultado = calcular()
+            return list(resultado) if len(nomes) > 1 else [resultado]
+
+        chaves = {nome: self._chave(nome, fontes, dependencias, assinatura) for nome in nomes}
+        caminhos = {nome: self._caminho(nome, chaves[nome]) for nome in nomes}
+
+        if all(os.path.exists(c) for c in caminhos.values()):
+            logging.info(f"⚡ Cache colunar: {', '.join(nomes)}")
+            frames = [self._ler(caminhos[nome]) for nome in nomes]
+        else:
+            resultado = calcular()
+            frames = list(resultado) if len(nomes) > 1 else [resultado]
+            frames = [_normalizar(df) for df in frames]
+            for nome, df in zip(nomes, frames):
+                self._gravar(df, caminhos[nome])
+            with self._trava:
+                self._remover_antigos()
+
+        with self._trava:
+            self.chaves.update(chaves)
+        return frames
+
+    def obter(self, nome, calcular, fontes=(), dependencias=(), assinatura=None):
+        return self.obter_varios([nome], calcular, fontes, dependencias, assinatura)[0]
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Linha de comando da análise criminal.
+
+Exemplos:
+    python -m analise_criminal                      # pipeline completo
+    python -m analise_criminal analisar projetar    # só essas etapas (e dependências)
+    python -m analise_criminal --listar
+    python -m analise_criminal --dados ./entrada --resultados ./saida --tempos-json tempos.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from analise_criminal.configuracao import configuracao_padrao
+from analise_criminal.pipeline import ETAPAS, executar, resolver_etapas
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m analise_criminal",
+        description="Análise criminal de Chicago (2001-2025) com projeção até 2030.",
+    )
+    parser.add_argument("etapas", nargs="*", metavar="ETAPA",
+                        help="etapas a executar (padrão: todas); as dependências entram automaticamente")
+    parser.add_argument("--listar", action="store_true", help="lista as etapas e dependências e sai")
+    parser.add_argument("--dados", help="pasta com o CSV bruto e as planilhas (padrão: ~/Desktop)")
+    parser.add_argument("--resultados", help="pasta de saída (padrão: <dados>/Analise_Criminal_Resultados)")
+    parser.add_argument("--csv", help="caminho do CSV bruto (padrão: <dados>/Crimes em Chicago.csv)")
+    parser.add_argument("--sem-csv", action="store_true", help="usa as planilhas pré-agregadas mesmo com o CSV")
+    parser.add_argument("--incremental", action="store_true",
+                        help="incorpora só o export diário ao estado incremental")
+    parser.add_argument("--csv-novos", help="export diário usado no modo incremental")
+    parser.add_argument("--formato-lateral", choices=["parquet", "csv", "nenhum"], default="parquet",
+                        help="cópia completa das abas grandes ao lado do Excel")
+    parser.add_argument("--sem-cache", action="store_true", help="não lê nem grava o cache colunar")
+    parser.add_argument("--sequencial", action="store_true", help="executa uma etapa por vez")
+    parser.add_argument("--max-paralelas", type=int, help="número máximo de etapas simultâneas")
+    parser.add_argument("--tempos-json", help="grava os tempos e a memória de cada etapa neste arquivo")
+    return parser
+
+
+def configurar_logging(pasta_resultados):
+    os.makedirs(pasta_resultados, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(os.path.join(pasta_resultados, 'analise_criminal.log')),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def configuracao_dos_argumentos(args):
+    opcoes = {
+        "modo_incremental": args.incremental,
+        "usar_cache": not args.sem_cache,
+        "formato_lateral": None if args.formato_lateral == "nenhum" else args.formato_lateral,
+    }
+    if args.sem_csv:
+        opcoes["arquivo_csv"] = None
+    elif args.csv:
+        opcoes["arquivo_csv"] = args.csv
+    if args.csv_novos:
+        opcoes["arquivo_csv_novos"] = args.csv_novos
+    return configuracao_padrao(args.dados, args.resultados, **opcoes)
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    if args.listar:
+        for etapa in ETAPAS:
+            dependencias = ", ".join(etapa.dependencias) or "-"
+            print(f"{etapa.nome:<10} {etapa.descricao}  [depende de: {dependencias}]")
+        return 0
+
+    cfg = configuracao_dos_argumentos(args)
+    configurar_logging(cfg.pasta_resultados)
+    try:
+        plano = resolver_etapas(args.etapas)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    logging.info("=" * 60)
+    logging.info("🔍 INÍCIO DA ANÁLISE CRIMINAL")
+    logging.info("=" * 60)
+    logging.info(f"Etapas: {', '.join(e.nome for e in plano)}")
+
+    inicio = time.perf_counter()
+    try:
+        _, tempos = executar(args.etapas, cfg, paralelo=not args.sequencial,
+                             max_paralelas=args.max_paralelas)
+    except Exception as e:
+        logging.error(f"❌ Análise interrompida: {e}")
+        return 1
+    total = time.perf_counter() - inicio
+
+    from tabulate import tabulate
+
+    print("\n⏱️ Tempo e memória por etapa:")
+    print(tabulate(tempos, headers='keys', tablefmt='psql', showindex=False, floatfmt=",.2f"))
+    picos = tempos["memoria_pico_mb"].dropna()
+    memoria = f"{picos.max():,.0f} MB" if len(picos) else "indisponível"
+    print(f"Tempo total: {total:.2f}s | pico de memória: {memoria}")
+
+    if args.tempos_json:
+        with open(args.tempos_json, "w", encoding="utf-8") as f:
+            json.dump({"total_s": total, "etapas": tempos.to_dict(orient="records")}, f, indent=2)
+
+    print("\n🏁 Análise finalizada com sucesso.")
+    print(f"📂 Resultados salvos em: {cfg.pasta_resultados}")
+    return 0
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Caminhos e opções de uma execução da análise.
+
+Os padrões reproduzem o script original (arquivos de entrada na Área de
+Trabalho e resultados em ``Analise_Criminal_Resultados``), mas podem ser
+trocados pela linha de comando ou pelas variáveis de ambiente
+``ANALISE_CRIMINAL_DADOS`` e ``ANALISE_CRIMINAL_RESULTADOS``.
+"""
+
+import os
+from collections import namedtuple
+
+_CAMPOS = [
+    "pasta_dados", "pasta_resultados",
+    "arquivo_csv", "arquivo_csv_novos",
+    "arquivo_ano_tipo", "arquivo_bairro", "arquivo_local",
+    "formato_lateral", "modo_incremental", "usar_cache",
+]
+
+
+class Configuracao(namedtuple("Configuracao", _CAMPOS)):
+    __slots__ = ()
+
+    @property
+    def arquivo_final(self):
+        return os.path.join(self.pasta_resultados, "Dados_Consolidados.xlsx")
+
+    @property
+    def arquivo_unificado(self):
+        return os.path.join(self.pasta_resultados, "Crimes_Unificados.xlsx")
+
+    @property
+    def pasta_cache(self):
+        return os.path.join(self.pasta_resultados, ".cache")
+
+    @property
+    def pasta_estado(self):
+        return os.path.join(self.pasta_resultados, ".estado_incremental")
+
+
+def configuracao_padrao(pasta_dados=None, pasta_resultados=None, **opcoes):
+    """Monta a ``Configuracao`` com os caminhos derivados das duas pastas.
+
+    ``opcoes`` sobrescreve qualquer campo (por exemplo ``arquivo_csv=None``
+    para forçar o uso das planilhas, ou ``modo_incremental=True``).
+    """
+    pasta_dados = (pasta_dados or os.environ.get("ANALISE_CRIMINAL_DADOS")
+                   or os.path.join(os.path.expanduser("~"), "Desktop"))
+    pasta_resultados = (pasta_resultados or os.environ.get("ANALISE_CRIMINAL_RESULTADOS")
+                        or os.path.join(pasta_dados, "Analise_Criminal_Resultados"))
+    valores = {
+        "pasta_dados": pasta_dados,
+        "pasta_resultados": pasta_resultados,
+        # Export bruto do portal de Chicago; quando existir, substitui as planilhas pré-agregadas
+        "arquivo_csv": os.path.join(pasta_dados, "Crimes em Chicago.csv"),
+        "arquivo_csv_novos": os.path.join(pasta_dados, "Crimes em Chicago - novos.csv"),
+        "arquivo_ano_tipo": os.path.join(pasta_dados, "Crimes_po_ano_tipo.xlsx"),
+        "arquivo_bairro": os.path.join(pasta_dados, "Crimes_por_bairro.xlsx"),
+        "arquivo_local": os.path.join(pasta_dados, "Local_dos_crimes.xlsx"),
+        # Cópia completa das abas grandes ao lado do Excel: "parquet", "csv" ou None
+        "formato_lateral": "parquet",
+        "modo_incremental": False,
+        "usar_cache": True,
+    }
+    desconhecidas = set(opcoes) - set(_CAMPOS)
+    if desconhecidas:
+        raise TypeError(f"Opções desconhecidas: {', '.join(sorted(desconhecidas))}")
+    valores.update(opcoes)
+    return Configuracao(**valores)
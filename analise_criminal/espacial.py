@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Índice espacial em grade sobre as coordenadas das ocorrências.
+
+As coordenadas do CSV bruto ("41,88804596") são convertidas para float e
+cada ocorrência é atribuída a uma célula de uma grade regular de
+latitude/longitude. Os pontos ficam guardados em arrays NumPy ordenados por
+célula, com um vetor de deslocamentos (formato CSR): a célula ``c`` ocupa as
+posições ``inicio[c]:inicio[c + 1]``. Não há um objeto Python por ponto.
+
+A partir desse índice são respondidas, de forma vetorizada:
+
+- densidade por célula (opcionalmente filtrada por tipo e ano);
+- top-N hotspots, no total ou por tipo/ano;
+- contagem exata dentro de um retângulo ou de um raio em metros.
+
+A grade também pode ser montada a partir das contagens por célula, tipo e
+ano (``contar_celulas``), com um peso por entrada em vez de um ponto por
+ocorrência; é assim que o modo incremental mantém a densidade sem reler
+as coordenadas do histórico.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from analise_criminal.ingestao import TAMANHO_BLOCO, ler_csv_em_blocos
+
+# Limites aproximados de Chicago; registros fora deles são coordenadas inválidas
+LIMITES_CHICAGO = {"lat_min": 41.60, "lat_max": 42.05, "lon_min": -87.95, "lon_max": -87.50}
+
+# ~550 m de latitude por célula
+TAMANHO_CELULA = 0.005
+
+RAIO_TERRA_M = 6_371_000.0
+
+
+def converter_coordenada(serie):
+    """Converte coordenadas com vírgula decimal ("41,888") para ``float64``."""
+    if pd.api.types.is_float_dtype(serie):
+        return serie.astype("float64")
+    return pd.to_numeric(serie.astype(str).str.replace(",", ".", regex=False), errors="coerce")
+
+
+def filtrar_pontos(latitude, longitude, tipos, anos):
+    """Ocorrências com coordenada dentro de Chicago e tipo e ano conhecidos."""
+    validos = (
+        latitude.between(LIMITES_CHICAGO["lat_min"], LIMITES_CHICAGO["lat_max"])
+        & longitude.between(LIMITES_CHICAGO["lon_min"], LIMITES_CHICAGO["lon_max"])
+        & tipos.notna()
+        & anos.notna()
+    )
+    return pd.DataFrame({
+        "latitude": latitude[validos],
+        "longitude": longitude[validos],
+        "primary_type": tipos[validos].astype("category"),
+        "year": anos[validos].astype("int16"),
+    })
+
+
+def juntar_pontos(partes):
+    """Concatena blocos de ``filtrar_pontos`` mantendo ``primary_type`` categórico."""
+    # Cada bloco tem as suas próprias categorias; a união evita passar por str
+    tipos = pd.api.types.union_categoricals([p["primary_type"] for p in partes], ignore_order=True)
+    pontos = pd.concat([p.drop(columns="primary_type") for p in partes], ignore_index=True)
+    pontos.insert(2, "primary_type", tipos)
+    return pontos
+
+
+def carregar_pontos_csv(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """Lê só as colunas espaciais do CSV bruto, em blocos.
+
+    Devolve um DataFrame com ``latitude``/``longitude`` (float64, para que as
+    contagens da grade sejam exatas), ``primary_type`` (categoria) e ``year``
+    (int16), sem as linhas com coordenada ausente ou fora de Chicago.
+    """
+    colunas = ["date", "primary_type", "year", "latitude", "longitude"]
+    partes = [
+        filtrar_pontos(converter_coordenada(bloco["latitude"]), converter_coordenada(bloco["longitude"]),
+                       bloco["primary_type"], bloco["year"])
+        for bloco in ler_csv_em_blocos(caminho, colunas, tamanho_bloco)
+    ]
+    pontos = juntar_pontos(partes)
+    logging.info(f"📍 {len(pontos):,} ocorrências com coordenadas válidas")
+    return pontos
+
+
+def contar_celulas(pontos, tamanho_celula=TAMANHO_CELULA):
+    """Ocorrências por ``celula``, ``primary_type`` e ``year`` na grade de Chicago.
+
+    ``pontos`` vem de ``filtrar_pontos``. Como a grade tem limites fixos, as
+    contagens de blocos diferentes podem ser somadas.
+    """
+    grade = GradeEspacial.de_dataframe(pontos, tamanho_celula=tamanho_celula, limites=LIMITES_CHICAGO)
+    return grade.contagens()
+
+
+def _dimensoes(limites, tamanho_celula):
+    n_lat = max(1, int(np.ceil((limites["lat_max"] - limites["lat_min"]) / tamanho_celula)) + 1)
+    n_lon = max(1, int(np.ceil((limites["lon_max"] - limites["lon_min"]) / tamanho_celula)) + 1)
+    return n_lat, n_lon
+
+
+class GradeEspacial:
+    """Grade regular de latitude/longitude com os pontos ordenados por célula.
+
+    ``pesos``, quando informado, é o número de ocorrências que cada ponto
+    representa (ver ``de_contagens``); sem ele cada ponto vale uma.
+    """
+
+    def __init__(self, latitude, longitude, tipos, anos, nomes_tipos,
+                 tamanho_celula=TAMANHO_CELULA, limites=None, pesos=None):
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        limites = limites or {
+            "lat_min": float(latitude.min()), "lat_max": float(latitude.max()),
+            "lon_min": float(longitude.min()), "lon_max": float(longitude.max()),
+        }
+        self.limites = limites
+        self.tamanho_celula = tamanho_celula
+        self.n_lat, self.n_lon = _dimensoes(limites, tamanho_celula)
+        self.nomes_tipos = pd.Index(nomes_tipos)
+
+        celulas = self._celula(latitude, longitude)
+        ordem = np.argsort(celulas, kind="stable")
+        self.celula = celulas[ordem]
+        # float64: as mesmas coordenadas usadas para atribuir as células
+        self.latitude = latitude[ordem]
+        self.longitude = longitude[ordem]
+        self.tipo = np.asarray(tipos, dtype=np.int16)[ordem]
+        self.ano = np.asarray(anos, dtype=np.int16)[ordem]
+        self.peso = None if pesos is None else np.asarray(pesos, dtype=np.int64)[ordem]
+        contagem = np.bincount(self.celula, minlength=self.n_lat * self.n_lon)
+        self.inicio = np.concatenate([[0], np.cumsum(contagem)]).astype(np.int64)
+
+    @classmethod
+    def de_dataframe(cls, pontos, **kwargs):
+        tipos = pontos["primary_type"].astype("category")
+        return cls(pontos["latitude"], pontos["longitude"], tipos.cat.codes,
+                   pontos["year"], tipos.cat.categories, **kwargs)
+
+    @classmethod
+    def de_contagens(cls, contagens, tamanho_celula=TAMANHO_CELULA, limites=LIMITES_CHICAGO):
+        """Grade a partir das colunas ``celula``, ``primary_type``, ``year`` e ``total``.
+
+        Cada linha vira um ponto no centro da célula com peso ``total``.
+        Densidade e hotspots ficam iguais aos da grade dos pontos originais;
+        ``contar_caixa`` e ``contar_raio`` passam a ter a resolução da célula.
+        """
+        n_lat, n_lon = _dimensoes(limites, tamanho_celula)
+        linha, coluna = np.divmod(contagens["celula"].to_numpy(dtype=np.int64), n_lon)
+        tipos = contagens["primary_type"].astype("category")
+        return cls(limites["lat_min"] + (linha + 0.5) * tamanho_celula,
+                   limites["lon_min"] + (coluna + 0.5) * tamanho_celula,
+                   tipos.cat.codes, contagens["year"], tipos.cat.categories,
+                   tamanho_celula=tamanho_celula, limites=limites, pesos=contagens["total"])
+
+    def __len__(self):
+        return len(self.celula)
+
+    # --------------------------------------------------
+    # Geometria da grade
+    # --------------------------------------------------
+    def _linha_coluna(self, latitude, longitude):
+        i = np.floor((np.asarray(latitude) - self.limites["lat_min"]) / self.tamanho_celula).astype(np.int64)
+        j = np.floor((np.asarray(longitude) - self.limites["lon_min"]) / self.tamanho_celula).astype(np.int64)
+        return np.clip(i, 0, self.n_lat - 1), np.clip(j, 0, self.n_lon - 1)
+
+    def _celula(self, latitude, longitude):
+        i, j = self._linha_coluna(latitude, longitude)
+        return (i * self.n_lon + j).astype(np.int32)
+
+    def centros(self):
+        """Latitudes e longitudes dos centros das linhas/colunas da grade."""
+        lat = self.limites["lat_min"] + (np.arange(self.n_lat) + 0.5) * self.tamanho_celula
+        lon = self.limites["lon_min"] + (np.arange(self.n_lon) + 0.5) * self.tamanho_celula
+        return lat, lon
+
+    def _somar(self, selecao, indices=None):
+        """Ocorrências nas posições ``selecao`` (máscara booleana), considerando os pesos."""
+        if self.peso is None:
+            return int(selecao.sum())
+        pesos = self.peso if indices is None else self.peso[indices]
+        return int(pesos[selecao].sum())
+
+    def _mascara(self, tipo=None, ano=None, indices=None):
+        tipos = self.tipo if indices is None else self.tipo[indices]
+        anos = self.ano if indices is None else self.ano[indices]
+        mascara = np.ones(len(tipos), dtype=bool)
+        if tipo is not None:
+            codigos = self.nomes_tipos.get_indexer(np.atleast_1d(tipo))
+            mascara &= np.isin(tipos, codigos[codigos >= 0])
+        if ano is not None:
+            mascara &= np.isin(anos, np.atleast_1d(ano))
+        return mascara
+
+    # --------------------------------------------------
+    # Consultas
+    # --------------------------------------------------
+    def densidade(self, tipo=None, ano=None):
+        """Matriz ``n_lat x n_lon`` com o número de ocorrências por célula."""
+        if tipo is None and ano is None and self.peso is None:
+            contagem = np.diff(self.inicio)
+        else:
+            mascara = self._mascara(tipo, ano)
+            pesos = None if self.peso is None else self.peso[mascara]
+            contagem = np.bincount(self.celula[mascara], weights=pesos,
+                                   minlength=self.n_lat * self.n_lon).astype(np.int64)
+        return contagem.reshape(self.n_lat, self.n_lon)
+
+    def contagens(self):
+        """Ocorrências por ``celula``, ``primary_type`` e ``year``, como ``Series``."""
+        return pd.DataFrame({
+            "celula": self.celula.astype(np.int64),
+            "primary_type": self.nomes_tipos.take(self.tipo),
+            "year": self.ano.astype(np.int64),
+            "total": np.ones(len(self), dtype=np.int64) if self.peso is None else self.peso,
+        }).groupby(["celula", "primary_type", "year"])["total"].sum()
+
+    def densidade_dataframe(self, tipo=None, ano=None):
+        """Densidade com as coordenadas dos centros como índice/colunas."""
+        lat, lon = self.centros()
+        return pd.DataFrame(self.densidade(tipo, ano), index=np.round(lat, 4), columns=np.round(lon, 4))
+
+    def hotspots(self, n=10, tipo=None, ano=None):
+        """As ``n`` células com mais ocorrências."""
+        contagem = self.densidade(tipo, ano).ravel()
+        n = min(n, int((contagem > 0).sum()))
+        topo = np.argpartition(-contagem, n - 1)[:n] if n else np.array([], dtype=np.int64)
+        topo = topo[np.argsort(-contagem[topo], kind="stable")]
+        return self._descrever_celulas(topo, contagem[topo])
+
+    def hotspots_por(self, n=5, por=("primary_type", "year")):
+        """Top-N células para cada combinação de tipo e/ou ano, sem laço por grupo."""
+        n_celulas = self.n_lat * self.n_lon
+        anos = self.ano.astype(np.int64) - int(self.ano.min()) if len(self) else self.ano.astype(np.int64)
+        chaves = {
+            "primary_type": (self.tipo.astype(np.int64), len(self.nomes_tipos)),
+            "year": (anos, int(anos.max()) + 1 if len(anos) else 1),
+        }
+        # Grupo e célula combinados num único inteiro: grupo * n_celulas + celula
+        grupo = np.zeros(len(self), dtype=np.int64)
+        for coluna in por:
+            valores, cardinalidade = chaves[coluna]
+            grupo = grupo * cardinalidade + valores
+        combinado = grupo * n_celulas + self.celula
+        pesos = self.peso
+        if "primary_type" in por:
+            # Tipo ausente (código -1) não pertence a nenhum grupo de tipo
+            validos = self.tipo >= 0
+            combinado = combinado[validos]
+            pesos = None if pesos is None else pesos[validos]
+        if combinado.size and combinado.max() < 50_000_000:
+            contagem = np.bincount(combinado, weights=pesos).astype(np.int64)
+            unicos = np.flatnonzero(contagem)
+            contagem = contagem[unicos]
+        else:
+            unicos, inverso = np.unique(combinado, return_inverse=True)
+            contagem = np.bincount(inverso, weights=pesos).astype(np.int64)
+
+        grupos, celulas = np.divmod(unicos, n_celulas)
+        ordem = np.lexsort((-contagem, grupos))
+        grupos, celulas, contagem = grupos[ordem], celulas[ordem], contagem[ordem]
+        # Posição de cada linha dentro do seu grupo (0 = maior contagem)
+        primeiro = np.r_[0, np.flatnonzero(np.diff(grupos)) + 1]
+        tamanhos = np.diff(np.r_[primeiro, len(grupos)])
+        posicao = np.arange(len(grupos)) - np.repeat(primeiro, tamanhos)
+        manter = posicao < n
+        grupos, celulas, contagem = grupos[manter], celulas[manter], contagem[manter]
+
+        resultado = {}
+        for coluna in reversed(por):
+            valores, cardinalidade = chaves[coluna]
+            grupos, resultado[coluna] = np.divmod(grupos, cardinalidade)
+        resultado = pd.DataFrame({coluna: resultado[coluna] for coluna in por})
+        if "primary_type" in por:
+            resultado["primary_type"] = self.nomes_tipos.take(resultado["primary_type"].to_numpy())
+        if "year" in por:
+            resultado["year"] = resultado["year"] + int(self.ano.min())
+        return pd.concat([resultado, self._descrever_celulas(celulas, contagem)], axis=1)
+
+    def _descrever_celulas(self, celulas, totais):
+        lat, lon = self.centros()
+        celulas = np.asarray(celulas, dtype=np.int64)
+        return pd.DataFrame({
+            "celula": celulas,
+            "lat_centro": lat[celulas // self.n_lon],
+            "lon_centro": lon[celulas % self.n_lon],
+            "total": np.asarray(totais, dtype=np.int64),
+        })
+
+    def _indices_caixa(self, lat_min, lat_max, lon_min, lon_max):
+        """Índices dos pontos nas células que cobrem o retângulo."""
+        i0, j0 = self._linha_coluna(lat_min, lon_min)
+        i1, j1 = self._linha_coluna(lat_max, lon_max)
+        # Cada linha da grade é um intervalo contíguo de células, logo de pontos
+        linhas = np.arange(i0, i1 + 1)
+        comecos = self.inicio[linhas * self.n_lon + j0]
+        fins = self.inicio[linhas * self.n_lon + j1 + 1]
+        if not len(linhas) or (fins - comecos).sum() == 0:
+            return np.array([], dtype=np.int64)
+        return np.concatenate([np.arange(a, b) for a, b in zip(comecos, fins)])
+
+    def contar_caixa(self, lat_min, lat_max, lon_min, lon_max, tipo=None, ano=None):
+        """Contagem exata de ocorrências dentro do retângulo."""
+        indices = self._indices_caixa(lat_min, lat_max, lon_min, lon_max)
+        lat, lon = self.latitude[indices], self.longitude[indices]
+        dentro = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+        return self._somar(dentro & self._mascara(tipo, ano, indices), indices)
+
+    def contar_raio(self, latitude, longitude, raio_m, tipo=None, ano=None):
+        """Contagem exata de ocorrências a até ``raio_m`` metros do ponto."""
+        dlat = np.degrees(raio_m / RAIO_TERRA_M)
+        dlon = dlat / max(np.cos(np.radians(latitude)), 1e-6)
+        indices = self._indices_caixa(latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon)
+
+        phi1, phi2 = np.radians(latitude), np.radians(self.latitude[indices])
+        dphi = phi2 - phi1
+        dlambda = np.radians(self.longitude[indices] - longitude)
+        a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+        distancia = 2 * RAIO_TERRA_M * np.arcsin(np.sqrt(a))
+        return self._somar((distancia <= raio_m) & self._mascara(tipo, ano, indices), indices)
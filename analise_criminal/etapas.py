@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""
+Etapas da análise criminal como funções importáveis.
+
+Cada função recebe os dados de que precisa e devolve os seus resultados, sem
+variáveis globais: gráficos e livros Excel são devolvidos como descrições
+(``Grafico`` e ``Aba``) para as etapas de renderização e exportação. Os
+módulos pesados (seaborn, openpyxl, fpdf) só são importados dentro das
+funções que os usam, de modo que ``from analise_criminal.etapas import
+analise_completa`` não carrega nada além de pandas e NumPy.
+"""
+
+import logging
+import os
+
+import pandas as pd
+from tabulate import tabulate
+
+from analise_criminal.ingestao import agregar_csv, carregar_series_anuais
+from analise_criminal.modelo_estrela import ModeloEstrela, integrar_agregados
+from analise_criminal.renderizacao import Grafico
+
+
+def mostrar_amostra(df, nome, n=3):
+    print(f"\n📑 Amostra de {nome} ({len(df)} registros):")
+    print(tabulate(df.head(n), headers='keys', tablefmt='psql', showindex=False))
+
+
+# ======================================================
+# CARREGAMENTO E CRUZAMENTO
+# ======================================================
+def preparar_estado(cfg, cache):
+    """Estado incremental em dia com o CSV completo e o export diário.
+
+    Devolve ``None`` fora do modo incremental ou sem o CSV bruto. O estado é
+    (re)inicializado quando ainda não existe, quando o CSV completo mudou
+    desde a carga inicial ou quando foi gravado por outra versão do formato.
+    """
+    from analise_criminal.incremental import VERSAO_ESTADO, EstadoIncremental
+
+    caminho_csv = cfg.arquivo_csv
+    if not (cfg.modo_incremental and caminho_csv and os.path.exists(caminho_csv)):
+        return None
+
+    estado = EstadoIncremental(cfg.pasta_estado)
+    fonte = cache.hash_arquivo(caminho_csv)
+    if estado.fonte != fonte or estado.versao != VERSAO_ESTADO:
+        if estado.inicializado:
+            motivo = ("O CSV completo mudou desde a carga inicial" if estado.fonte != fonte
+                      else "O formato do estado mudou")
+            logging.info(f"🔁 {motivo}; reconstruindo o estado")
+        estado.inicializar(caminho_csv, fonte)
+    if cfg.arquivo_csv_novos and os.path.exists(cfg.arquivo_csv_novos):
+        estado.atualizar(cfg.arquivo_csv_novos)
+    return estado
+
+
+def carregar_dados(cfg, cache, estado=None):
+    """Lê ``df_ano``, ``df_bairro`` e ``df_local`` do CSV bruto, do estado
+    incremental ou das planilhas pré-agregadas, passando pelo cache colunar.
+
+    Devolve também o número de registros lidos (``None`` com as planilhas),
+    usado na conferência dos totais.
+    """
+    logging.info("Iniciando carregamento dos dados...")
+    caminho_csv = cfg.arquivo_csv
+    usar_csv = bool(caminho_csv) and os.path.exists(caminho_csv)
+    fontes = [caminho_csv] if usar_csv else [cfg.arquivo_ano_tipo, cfg.arquivo_bairro, cfg.arquivo_local]
+    assinatura = None
+
+    if estado is None:
+        estado = preparar_estado(cfg, cache)
+    if estado is not None:
+        # O estado já reflete o histórico e os deltas; a chave do cache
+        # passa a ser o hash dos agregados, não o do CSV bruto
+        fontes, assinatura = [], estado.assinatura()
+
+    def ler_fontes():
+        total = None
+        if estado is not None:
+            df_ano, df_bairro, df_local = estado.agregados()
+            total = estado.total_registros
+        elif usar_csv:
+            df_ano, df_bairro, df_local, total = agregar_csv(caminho_csv)
+        else:
+            df_ano = pd.read_excel(cfg.arquivo_ano_tipo, sheet_name="Crimes_por_ano_tipo")
+            df_bairro = pd.read_excel(cfg.arquivo_bairro, sheet_name="Crimes_por_bairro")
+            df_local = pd.read_excel(cfg.arquivo_local, sheet_name="Localizacao_natureza")
+
+        df_ano["year"] = df_ano["year"].astype(int)
+        df_local["year"] = df_local["year"].fillna(0).astype(int)
+        return df_ano, df_bairro, df_local, pd.DataFrame({"registros": pd.array([total], dtype="Int64")})
+
+    df_ano, df_bairro, df_local, registros = cache.obter_varios(
+        ["df_ano", "df_bairro", "df_local", "total_registros"], ler_fontes, fontes=fontes, assinatura=assinatura
+    )
+    total_registros = None if pd.isna(registros["registros"].iloc[0]) else int(registros["registros"].iloc[0])
+
+    for df, nome in zip([df_ano, df_bairro, df_local], ["Anual", "Bairro", "Local"]):
+        if df.empty:
+            raise ValueError(f"Dataset {nome} está vazio")
+
+    logging.info("✅ Dados carregados com sucesso!")
+    return df_ano, df_bairro, df_local, total_registros
+
+
+def cruzar_dados(df_ano, df_bairro, df_local, cache, total_registros=None):
+    """Tabela integrada, modelo estrela e conferência dos totais.
+
+    Os três agregados são empilhados (uma linha por linha de entrada) em vez
+    de cruzados por primary_type, o que multiplicava cada ano por bairros x
+    locais. ``total_registros`` (o número de registros lidos do CSV) entra
+    na conferência quando disponível.
+    """
+    merged = cache.obter("merged", lambda: integrar_agregados(df_ano, df_bairro, df_local),
+                         dependencias=["df_ano", "df_bairro", "df_local"])
+    modelo = ModeloEstrela(merged)
+    conferencia_totais = modelo.verificar_totais(total_registros)
+    return merged, modelo, conferencia_totais
+
+
+# ======================================================
+# ANÁLISES ESTATÍSTICAS
+# ======================================================
+def analise_completa(modelo):
+    try:
+        evolucao = modelo.agregar(['year'])
+        crimes = modelo.serie('primary_type').nlargest(5)
+        locais = modelo.serie('location_description').nlargest(5)
+        prisoes = modelo.agregar(['ward', 'arrest']).dropna(subset=['ward', 'arrest'])
+        if not prisoes.empty:
+            por_ward = prisoes.pivot_table(index='ward', columns='arrest', values='total_crimes',
+                                           aggfunc='sum', fill_value=0)
+            com_prisao = por_ward.get(True, pd.Series(0, index=por_ward.index))
+            eficiencia = pd.DataFrame({
+                'total_prisoes': com_prisao,
+                'taxa_prisao': com_prisao / por_ward.sum(axis=1)
+            }).nlargest(5, 'taxa_prisao').reset_index()
+        else:
+            eficiencia = pd.DataFrame()
+        return {'evolucao': evolucao, 'crimes': crimes, 'locais': locais, 'eficiencia': eficiencia}
+    except Exception as e:
+        print(f"\n❌ Erro nas análises: {e}")
+        return {'evolucao': pd.DataFrame(), 'crimes': pd.Series(dtype=float), 'locais': pd.Series(dtype=float), 'eficiencia': pd.DataFrame()}
+
+
+DESCRICAO_ESTATISTICAS = {
+    'count': ('Contagem', 'Número total de registros de anos analisados', 'Quantidade de pontos de dados disponíveis'),
+    'mean': ('Média', 'Média aritmética dos crimes por ano', 'Nível médio de criminalidade anual'),
+    'std': ('Desvio Padrão', 'Variação dos crimes entre os anos', 'Quanto os números variam da média'),
+    'min': ('Mínimo', 'Ano com menor total de crimes', 'Menor valor registrado no histórico'),
+    '25%': ('1º Quartil (25%)', '25% dos anos têm menos que esse total de crimes', 'Limite inferior da média histórica'),
+    '50%': ('Mediana (50%)', 'Valor central da distribuição de crimes por ano', '50% dos anos estão abaixo/acima'),
+    '75%': ('3º Quartil (75%)', '75% dos anos têm menos que esse total de crimes', 'Limite superior da média histórica'),
+    'max': ('Máximo', 'Ano com maior total de crimes', 'Pico histórico de criminalidade anual')
+}
+
+
+def estatisticas_descritivas(df_ano):
+    """Estatísticas de ``total_crimes`` com descrição e interpretação executiva."""
+    estatisticas_detalhadas = []
+    for chave, valor in df_ano['total_crimes'].describe().items():
+        nome, descricao, interpretacao = DESCRICAO_ESTATISTICAS.get(chave, (chave, '', ''))
+        estatisticas_detalhadas.append({
+            'Estatística': nome,
+            'Valor': f'{valor:,.2f}',
+            'Descrição': descricao,
+            'Interpretação Executiva': interpretacao
+        })
+    return pd.DataFrame(estatisticas_detalhadas)
+
+
+# ======================================================
+# ANÁLISE EXPLORATÓRIA
+# ======================================================
+# Os gráficos são apenas descritos aqui; o desenho acontece de uma vez na
+# etapa de renderização, em paralelo e reaproveitando os PNGs sem mudança.
+def criar_grafico_linha_tendencia(df):
+    from analise_criminal.graficos import desenhar_tendencia
+
+    top_crimes = df.groupby('primary_type')['total_crimes'].sum().nlargest(5).index
+    df_filtered = df[df['primary_type'].isin(top_crimes)]
+    return Grafico("tendencia_top_crimes", desenhar_tendencia, df_filtered, {"figsize": (12, 6)})
+
+
+def criar_heatmap_distribuicao(df):
+    from analise_criminal.graficos import desenhar_heatmap
+
+    cross_tab = df.fillna({'location_description': 'Não especificado'}).pivot_table(
+        index='primary_type', columns='location_description',
+        values='total_crimes', aggfunc='sum', fill_value=0
+    )
+    cross_tab = cross_tab.loc[:, cross_tab.sum().nlargest(10).index]
+    return Grafico("heatmap_distribuicao", desenhar_heatmap, cross_tab, {"figsize": (10, 8)})
+
+
+def analise_exploratoria(modelo):
+    """Devolve ``(exploratorios, graficos)``: descrições e gráficos a renderizar."""
+    from analise_criminal.graficos import (
+        COLOR_PRIMARY, COLOR_SECONDARY, desenhar_boxplot, desenhar_distribuicao_ano,
+    )
+
+    exploratorios = {}
+    graficos = []
+    df = modelo.agregar(["year", "primary_type"])
+
+    # Gráfico de distribuição anual
+    graficos.append(Grafico(
+        "distribuicao_ano", desenhar_distribuicao_ano,
+        df.groupby("year")["total_crimes"].sum().reset_index(),
+        {"figsize": (12, 6), "cor": COLOR_PRIMARY}
+    ))
+    exploratorios["distribuicao_ano"] = "Distribuição anual de crimes"
+
+    graficos.append(criar_grafico_linha_tendencia(df))
+    exploratorios["tendencia_top_crimes"] = "Evolução dos principais tipos de crime"
+
+    graficos.append(criar_heatmap_distribuicao(modelo.agregar(["primary_type", "location_description"])))
+    exploratorios["heatmap_distribuicao"] = "Relação entre tipo de crime e localização"
+
+    graficos.append(Grafico(
+        "boxplot", desenhar_boxplot, df[["total_crimes"]],
+        {"figsize": (10, 6), "cor": COLOR_SECONDARY}
+    ))
+    exploratorios["boxplot_crimes"] = "Boxplot da distribuição de crimes"
+
+    # Estatísticas descritivas
+    stats = df["total_crimes"].describe()
+    print(f"\n📊 Estatísticas descritivas de total_crimes:\n{stats}")
+
+    return exploratorios, graficos
+
+
+def analise_espacial(caminho_csv, cache, estado=None):
+    """Hotspots e mapa de densidade a partir das coordenadas do CSV bruto.
+
+    Só o CSV bruto tem coordenadas; sem ele devolve tabelas vazias e nenhum
+    gráfico. Com ``estado`` (modo incremental) a grade é montada das
+    contagens por célula mantidas pelo estado, já com os deltas, sem reler
+    as coordenadas. O retorno é ``(hotspots, hotspots_tipo_ano, graficos)``.
+    """
+    if not caminho_csv or not os.path.exists(caminho_csv):
+        return pd.DataFrame(), pd.DataFrame(), []
+
+    from analise_criminal.espacial import LIMITES_CHICAGO, GradeEspacial, carregar_pontos_csv
+    from analise_criminal.graficos import desenhar_mapa_densidade
+
+    print("\n🗺️ Construindo grade espacial...")
+    if estado is not None:
+        contagens = cache.obter("densidade_espacial", estado.densidade_espacial,
+                                assinatura=estado.assinatura(["densidade_espacial"]))
+        grade = GradeEspacial.de_contagens(contagens, limites=LIMITES_CHICAGO)
+    else:
+        pontos = cache.obter("pontos_espaciais", lambda: carregar_pontos_csv(caminho_csv),
+                             fontes=[caminho_csv])
+        grade = GradeEspacial.de_dataframe(pontos, limites=LIMITES_CHICAGO)
+    hotspots = grade.hotspots(n=10)
+    hotspots_tipo_ano = grade.hotspots_por(n=3, por=("primary_type", "year"))
+    mostrar_amostra(hotspots, "Hotspots (células de ~500 m)", n=10)
+
+    grafico = Grafico("mapa_densidade", desenhar_mapa_densidade, grade.densidade_dataframe(),
+                      {"figsize": (10, 10)})
+    return hotspots, hotspots_tipo_ano, [grafico]
+
+
+# ======================================================
+# PROJEÇÕES ATÉ 2030
+# ======================================================
+def gerar_projecao_criminalidade(df):
+    """Projeção do total anual de Chicago até 2030.
+
+    Devolve ``(df_proj, grafico)``: a tabela ``Ano``/``Projecao_Crimes`` e o
+    gráfico comparando dados reais e projeção.
+    """
+    from analise_criminal.graficos import desenhar_projecao
+    from analise_criminal.previsao import projetar_series
+
+    df_ano = df.groupby('year')['total_crimes'].sum().reset_index()
+    df_ano = df_ano[df_ano['year'] >= 2001]
+
+    # Modelo: mínimos quadrados em forma fechada (mesmo ajuste do LinearRegression)
+    projecao = projetar_series(df_ano.assign(serie="Chicago"), "serie")
+
+    df_proj = pd.DataFrame({
+        "Ano": projecao["year"].to_numpy(),
+        "Projecao_Crimes": projecao["projecao"].round().astype(int).to_numpy()
+    })
+    grafico = Grafico("projecao_crimes", desenhar_projecao,
+                      {"reais": df_ano, "projecao": df_proj}, {"figsize": (12, 6)})
+    return df_proj, grafico
+
+
+def carregar_series_segmentos(caminho_csv, cache, df_ano, estado=None):
+    if estado is not None:
+        return cache.obter("series_anuais", estado.series_anuais,
+                           assinatura=estado.assinatura(["series_anuais"]))
+    if caminho_csv and os.path.exists(caminho_csv):
+        return cache.obter("series_anuais", lambda: carregar_series_anuais(caminho_csv), fontes=[caminho_csv])
+    # Sem o CSV bruto, só as planilhas anuais têm ano: projeta-se apenas por tipo
+    return pd.DataFrame({
+        "segmento": "primary_type",
+        "chave": df_ano["primary_type"].astype(str),
+        "year": df_ano["year"],
+        "total_crimes": df_ano["total_crimes"]
+    })
+
+
+def projetar_por_segmento(series_segmentos):
+    """Projeção vetorizada por tipo, área comunitária e ward."""
+    from analise_criminal.previsao import projetar_segmentos
+
+    projecao_segmentos = projetar_segmentos(series_segmentos[series_segmentos["year"] >= 2001])
+    print(f"✅ {projecao_segmentos.groupby(['segmento', 'chave']).ngroups} séries projetadas até 2030")
+    return projecao_segmentos
+
+
+# ======================================================
+# LIVROS EXCEL
+# ======================================================
+def unificar_dados(merged):
+    """Base unificada a partir da tabela integrada, com ``CRIME_GRAVE`` e
+    ``CRIMES_POR_1000_HAB``."""
+    df_merged = merged.copy()
+    df_merged.columns = df_merged.columns.str.strip()
+
+    # Marcar crimes graves
+    df_merged["CRIME_GRAVE"] = df_merged["primary_type"].apply(
+        lambda x: "Sim" if str(x).upper() in ["HOMICÍDIO", "ESTUPRO", "LATROCÍNIO"] else "Não"
+    )
+
+    # Tentar encontrar uma coluna com "total" no nome para calcular a taxa por 1000 hab
+    coluna_total = next((col for col in df_merged.columns if "total" in col.lower()), None)
+    if coluna_total:
+        try:
+            df_merged["CRIMES_POR_1000_HAB"] = df_merged[coluna_total] / (df_merged[coluna_total] / 1000)
+        except Exception as e:
+            print(f"⚠️ Erro ao calcular CRIMES_POR_1000_HAB com '{coluna_total}': {e}")
+    else:
+        print("⚠️ Nenhuma coluna de total encontrada para calcular CRIMES_POR_1000_HAB.")
+    return df_merged
+
+
+def montar_livros(cfg, df_ano, df_bairro, df_local, merged, df_merged, resultados_analise,
+                  df_proj, projecao_segmentos, hotspots, hotspots_tipo_ano):
+    """Dicionário ``caminho -> {aba: dados}`` com os três livros do projeto."""
+    from analise_criminal.exportacao import Aba
+
+    abas_consolidadas = {
+        'Dados_Anuais': df_ano,
+        'Dados_Bairro': df_bairro,
+        'Dados_Localizacao': df_local,
+        'Dados_Integrados': Aba(merged, saida_lateral=len(merged) > 100_000),
+    }
+    for nome, dados in resultados_analise.items():
+        if not dados.empty:
+            abas_consolidadas[nome.capitalize()] = dados
+    abas_consolidadas['Projecao_2030'] = df_proj
+    abas_consolidadas['Projecao_Segmentos'] = projecao_segmentos
+    if not hotspots.empty:
+        abas_consolidadas['Hotspots'] = hotspots
+        abas_consolidadas['Hotspots_Tipo_Ano'] = hotspots_tipo_ano
+    abas_consolidadas['Estatisticas_Total'] = estatisticas_descritivas(df_ano)
+
+    return {
+        os.path.join(cfg.pasta_resultados, "tabela_projecao_2030.xlsx"): {
+            "Sheet1": Aba(df_proj, formatada=True, formatos={"Projecao_Crimes": '#,##0'})
+        },
+        cfg.arquivo_final: abas_consolidadas,
+        cfg.arquivo_unificado: {
+            "Sheet1": Aba(df_merged, saida_lateral=len(df_merged) > 100_000)
+        },
+    }
+
+
+def exportar_excel(livros, formato_lateral=None):
+    from analise_criminal.exportacao import exportar_livros
+
+    print("\n💾 Salvando arquivos Excel...")
+    return exportar_livros(livros, formato_lateral=formato_lateral)
+
+
+def gerar_relatorio_pdf_completo(resultados_analise, pasta_resultados):
+    from analise_criminal.relatorio import gerar_relatorio_pdf_completo as gerar
+
+    return gerar(resultados_analise, pasta_resultados)
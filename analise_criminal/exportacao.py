@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Exportação em lote das planilhas Excel do projeto.
+
+Todos os livros (``Dados_Consolidados``, ``Crimes_Unificados`` e a tabela de
+projeção) são gravados numa única chamada, com o openpyxl em modo
+``write_only``: as linhas vão direto para o arquivo, sem montar a planilha
+em memória nem reabrir o arquivo para formatar célula a célula.
+
+- A formatação usa estilos nomeados registrados uma vez por livro.
+- A largura das colunas é calculada a partir de uma amostra das linhas.
+- Abas acima do limite de linhas do Excel são divididas em ``Aba``,
+  ``Aba_2``, ``Aba_3``...
+- Abas grandes podem ter uma cópia completa em Parquet ou CSV.
+- Livros cujo conteúdo não mudou desde a última exportação não são
+  regravados (hash guardado em ``.livros_hash.json`` na pasta de saída).
+"""
+
+import json
+import logging
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+
+from analise_criminal.cache import hash_dados
+
+# 1.048.576 linhas por aba, menos a linha de cabeçalho
+LINHAS_POR_ABA = 1_048_575
+LINHAS_AMOSTRA_LARGURA = 1_000
+LARGURA_MAXIMA = 60
+BLOCO_LINHAS = 50_000
+MANIFESTO_LIVROS = ".livros_hash.json"
+
+# ``formatada`` aplica borda/centralização em todas as células (para tabelas
+# pequenas); ``formatos`` mapeia coluna -> number_format; ``saida_lateral``
+# força (True) ou impede (False) a cópia em Parquet/CSV da aba.
+Aba = namedtuple("Aba", ["dados", "formatada", "formatos", "saida_lateral"],
+                 defaults=(False, None, None))
+
+_BORDA = Border(left=Side(style='thin'), right=Side(style='thin'),
+                top=Side(style='thin'), bottom=Side(style='thin'))
+
+
+def _estilos():
+    cabecalho = NamedStyle(name="cabecalho", font=Font(bold=True),
+                           alignment=Alignment(horizontal="center"), border=_BORDA)
+    celula = NamedStyle(name="celula", alignment=Alignment(horizontal="center"), border=_BORDA)
+    milhar = NamedStyle(name="celula_milhar", alignment=Alignment(horizontal="center"),
+                        border=_BORDA, number_format='#,##0')
+    return [cabecalho, celula, milhar]
+
+
+def _larguras(df):
+    """Largura de cada coluna a partir do cabeçalho e de uma amostra das linhas."""
+    if len(df) > LINHAS_AMOSTRA_LARGURA:
+        metade = LINHAS_AMOSTRA_LARGURA // 2
+        amostra = pd.concat([df.head(metade), df.sample(metade, random_state=0)])
+    else:
+        amostra = df
+    larguras = []
+    for coluna in df.columns:
+        valores = amostra[coluna].dropna().astype(str)
+        maior = max(len(str(coluna)), valores.str.len().max() if len(valores) else 0)
+        larguras.append(min(maior + 2, LARGURA_MAXIMA))
+    return larguras
+
+
+def _linhas(df):
+    """Itera as linhas como tuplas Python, trocando nulos por ``None``."""
+    for inicio in range(0, len(df), BLOCO_LINHAS):
+        bloco = df.iloc[inicio:inicio + BLOCO_LINHAS].astype(object)
+        bloco = bloco.where(bloco.notna(), None)
+        yield from bloco.itertuples(index=False, name=None)
+
+
+def _valor_excel(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def _nomes_abas(nome, total_linhas):
+    partes = max(1, -(-total_linhas // LINHAS_POR_ABA))
+    nomes = [nome[:31]]
+    for i in range(2, partes + 1):
+        sufixo = f"_{i}"
+        nomes.append(nome[:31 - len(sufixo)] + sufixo)
+    return nomes
+
+
+def _escrever_aba(wb, nome, aba):
+    df = aba.dados
+    formatos = aba.formatos or {}
+    larguras = _larguras(df)
+    estilo_coluna = [
+        ("celula_milhar" if formatos.get(c) == '#,##0' else "celula") if aba.formatada else None
+        for c in df.columns
+    ]
+    linhas = _linhas(df)
+    nomes = _nomes_abas(nome, len(df))
+
+    for parte, nome_aba in enumerate(nomes):
+        ws = wb.create_sheet(title=nome_aba)
+        for i, largura in enumerate(larguras, start=1):
+            ws.column_dimensions[get_column_letter(i)].width = largura
+
+        cabecalho = []
+        for coluna in df.columns:
+            celula = WriteOnlyCell(ws, value=str(coluna))
+            celula.style = "cabecalho"
+            cabecalho.append(celula)
+        ws.append(cabecalho)
+
+        restantes = min(LINHAS_POR_ABA, len(df) - parte * LINHAS_POR_ABA)
+        for _ in range(restantes):
+            linha = next(linhas)
+            if aba.formatada:
+                celulas = []
+                for valor, estilo, coluna in zip(linha, estilo_coluna, df.columns):
+                    celula = WriteOnlyCell(ws, value=_valor_excel(valor))
+                    celula.style = estilo
+                    if coluna in formatos and estilo == "celula":
+                        celula.number_format = formatos[coluna]
+                    celulas.append(celula)
+                ws.append(celulas)
+            else:
+                ws.append([_valor_excel(v) for v in linha])
+    return nomes
+
+
+def _gravar_lateral(df, caminho_livro, nome, formato):
+    base = os.path.splitext(caminho_livro)[0]
+    if formato == "parquet":
+        caminho = f"{base}_{nome}.parquet"
+        df.to_parquet(caminho, index=False)
+    else:
+        caminho = f"{base}_{nome}.csv"
+        df.to_csv(caminho, index=False)
+    logging.info(f"📦 Cópia completa de '{nome}' salva em: {caminho}")
+    return caminho
+
+
+def _ler_manifesto(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _hash_livro(abas, formato_lateral, linhas_lateral):
+    return hash_dados({
+        "abas": {nome: (aba if isinstance(aba, Aba) else Aba(aba))._asdict()
+                 for nome, aba in abas.items()},
+        "ordem": list(abas),
+        "lateral": (formato_lateral, linhas_lateral),
+    })
+
+
+def exportar_livros(livros, formato_lateral=None, linhas_lateral=LINHAS_POR_ABA,
+                    pular_inalterados=True):
+    """Grava todos os livros de ``livros`` e devolve os caminhos gerados.
+
+    ``livros`` é um dicionário ``caminho -> {nome_da_aba: Aba ou DataFrame}``.
+    Com ``formato_lateral`` igual a "parquet" ou "csv", as abas com mais de
+    ``linhas_lateral`` linhas (ou marcadas com ``saida_lateral=True``) também
+    são gravadas integralmente nesse formato, ao lado do ``.xlsx``.
+
+    Com ``pular_inalterados``, livros que já existem com o mesmo conteúdo
+    da última exportação são mantidos e ficam fora da lista devolvida.
+    """
+    gerados = []
+    for caminho, abas in livros.items():
+        pasta = os.path.dirname(caminho) or "."
+        os.makedirs(pasta, exist_ok=True)
+        caminho_manifesto = os.path.join(pasta, MANIFESTO_LIVROS)
+        manifesto = _ler_manifesto(caminho_manifesto)
+        assinatura = _hash_livro(abas, formato_lateral, linhas_lateral)
+        nome_livro = os.path.basename(caminho)
+        if pular_inalterados and manifesto.get(nome_livro) == assinatura and os.path.exists(caminho):
+            print(f"⏭️ Arquivo Excel inalterado, mantido: {caminho}")
+            continue
+
+        wb = Workbook(write_only=True)
+        for estilo in _estilos():
+            wb.add_named_style(estilo)
+
+        for nome, aba in abas.items():
+            if not isinstance(aba, Aba):
+                aba = Aba(aba)
+            if isinstance(aba.dados, pd.Series):
+                aba = aba._replace(dados=aba.dados.reset_index())
+            nomes = _escrever_aba(wb, nome, aba)
+            if len(nomes) > 1:
+                logging.info(f"✂️ Aba '{nome}' dividida em {len(nomes)} partes: {', '.join(nomes)}")
+
+            lateral = aba.saida_lateral
+            if lateral is None:
+                lateral = len(aba.dados) > linhas_lateral
+            if formato_lateral and lateral:
+                gerados.append(_gravar_lateral(aba.dados, caminho, nome, formato_lateral))
+
+        wb.save(caminho)
+        gerados.append(caminho)
+        print(f"✅ Arquivo Excel salvo: {caminho}")
+
+        manifesto[nome_livro] = assinatura
+        with open(caminho_manifesto, "w", encoding="utf-8") as f:
+            json.dump(manifesto, f, indent=2)
+    return gerados
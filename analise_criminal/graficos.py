@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Desenho dos gráficos do relatório com a API orientada a objetos do Matplotlib.
+
+Cada função recebe uma ``Figure`` já criada e os dados prontos e desenha
+apenas nos seus próprios eixos, sem tocar no estado global do ``pyplot``.
+Isso permite que o módulo ``renderizacao`` gere as figuras em processos
+separados. O seaborn só é importado ao desenhar, para que descrever um
+gráfico (``Grafico``) nas etapas de análise não carregue a biblioteca.
+"""
+
+COLOR_PRIMARY = '#2ecc71'
+COLOR_SECONDARY = '#34495e'
+
+
+def desenhar_distribuicao_ano(fig, df, cor=COLOR_PRIMARY):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.barplot(data=df, x="year", y="total_crimes", color=cor, ax=ax)
+
+    for p in ax.patches:
+        ax.annotate(f"{p.get_height():.0f}",
+                    (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='center',
+                    xytext=(0, 9),
+                    textcoords='offset points',
+                    fontsize=9)
+
+    ax.set_title("Distribuição Anual de Crimes", fontsize=14, pad=15)
+    ax.set_xlabel("Ano", fontsize=12)
+    ax.set_ylabel("Total de Crimes", fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+def desenhar_tendencia(fig, df):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.lineplot(
+        data=df,
+        x='year',
+        y='total_crimes',
+        hue='primary_type',
+        style='primary_type',
+        markers=True,
+        dashes=False,
+        linewidth=2.5,
+        markersize=8,
+        ax=ax
+    )
+    ax.set_title('Evolução Temporal dos Principais Tipos de Crime', fontsize=14, pad=20)
+    ax.set_xlabel('Ano', fontsize=12)
+    ax.set_ylabel('Total de Ocorrências', fontsize=12)
+    ax.legend(title='Tipo de Crime', bbox_to_anchor=(1.05, 1), loc='upper left')
+
+
+def desenhar_heatmap(fig, cross_tab):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.heatmap(
+        cross_tab,
+        cmap='rocket',
+        annot=True,
+        fmt='d',
+        linewidths=.5,
+        annot_kws={"size": 8},
+        ax=ax
+    )
+    ax.set_title('Distribuição de Crimes por Local e Tipo', fontsize=14, pad=20)
+    ax.set_xlabel('Localização', fontsize=12)
+    ax.set_ylabel('Tipo de Crime', fontsize=12)
+    for rotulo in ax.get_xticklabels():
+        rotulo.set_rotation(45)
+        rotulo.set_horizontalalignment('right')
+
+
+def desenhar_boxplot(fig, df, cor=COLOR_SECONDARY):
+    import seaborn as sns
+
+    ax = fig.subplots()
+    sns.boxplot(
+        x=df["total_crimes"],
+        color=cor,
+        showfliers=False,
+        notch=True,
+        ax=ax
+    )
+    ax.set_title("Distribuição de Crimes por Registro", fontsize=14, pad=15)
+    ax.set_xlabel("Total de Crimes", fontsize=12)
+
+
+def desenhar_projecao(fig, dados):
+    reais, projecao = dados["reais"], dados["projecao"]
+    ax = fig.subplots()
+    ax.plot(reais["year"], reais["total_crimes"], label="Dados Reais", color='blue', marker='o')
+    ax.plot(projecao["Ano"], projecao["Projecao_Crimes"], label="Projeção até 2030",
+            linestyle="--", color="orange", marker='x')
+    ax.set_title("Projeção da Criminalidade até 2030", fontsize=14)
+    ax.set_xlabel("Ano")
+    ax.set_ylabel("Total de Crimes")
+    ax.legend()
+    ax.grid(True)
+
+
+def desenhar_mapa_densidade(fig, densidade, cmap='rocket'):
+    """Mapa de calor da grade espacial (linhas = latitude, colunas = longitude)."""
+    ax = fig.subplots()
+    lat, lon = densidade.index.to_numpy(), densidade.columns.to_numpy()
+    passo_lat = lat[1] - lat[0] if len(lat) > 1 else 0.005
+    passo_lon = lon[1] - lon[0] if len(lon) > 1 else 0.005
+    extensao = [lon[0] - passo_lon / 2, lon[-1] + passo_lon / 2,
+                lat[0] - passo_lat / 2, lat[-1] + passo_lat / 2]
+    valores = densidade.to_numpy().astype(float)
+    valores[valores == 0] = float("nan")  # células vazias ficam transparentes
+    imagem = ax.imshow(valores, origin='lower', extent=extensao, cmap=cmap,
+                       aspect='auto', interpolation='nearest')
+    fig.colorbar(imagem, ax=ax, label='Ocorrências por célula')
+    ax.set_title('Mapa de Densidade Criminal', fontsize=14, pad=15)
+    ax.set_xlabel('Longitude', fontsize=12)
+    ax.set_ylabel('Latitude', fontsize=12)
+    ax.grid(False)
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+Atualização incremental dos agregados a partir dos exports diários.
+
+O estado fica numa pasta com:
+
+- ``df_ano.parquet``, ``df_bairro.parquet`` e ``df_local.parquet``: os
+  agregados atuais, no mesmo formato de ``carregar_dados_csv``;
+- ``series_anuais.parquet``: as contagens ``year`` x segmento, no mesmo
+  formato de ``carregar_series_anuais``;
+- ``densidade_espacial.parquet``: as ocorrências por célula da grade
+  espacial, tipo e ano (``contar_celulas``), das quais a análise espacial
+  monta a grade sem reler as coordenadas;
+- ``registros/faixa_XXXX.parquet``: a contribuição de cada ``unique_key``
+  (as colunas usadas nos agregados e as coordenadas), particionada por
+  faixas de ``unique_key``. Como as chaves novas são crescentes, um delta
+  diário costuma tocar só as últimas faixas;
+- ``estado.json``: a marca d'água (maior ``updated_on`` já processado), o
+  número de registros, o hash do CSV completo que originou o estado, a
+  versão do formato e o hash de cada agregado e de cada faixa.
+
+``atualizar`` lê apenas o arquivo do delta, descarta registros que não são
+mais novos que a marca d'água, retira dos agregados a contribuição antiga
+das ``unique_key`` reenviadas e soma a nova. O custo depende do tamanho do
+delta e das faixas tocadas, não do histórico inteiro.
+
+Os arquivos novos são gravados com o sufixo ``.pendente``; a lista deles
+entra no ``estado.json`` junto com a nova marca d'água, e só então são
+movidos para o lugar com ``os.replace``. Se o processo cair antes do
+``estado.json``, os pendentes são descartados e o delta é reaplicado do
+zero; se cair depois, a próxima abertura conclui a troca dos arquivos.
+"""
+
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from analise_criminal.cache import hash_arquivo, hash_dados
+from analise_criminal.espacial import contar_celulas, converter_coordenada, filtrar_pontos
+from analise_criminal.ingestao import (
+    CHAVES_ANO, CHAVES_BAIRRO, CHAVES_LOCAL, COLUNAS_AGREGADOS, FORMATO_DATA,
+    TAMANHO_BLOCO, acumular_contagens, contar_agregados, contar_series, finalizar_agregados,
+    finalizar_series, ler_csv_em_blocos,
+)
+
+NOMES = ["df_ano", "df_bairro", "df_local"]
+SERIES = "series_anuais"
+DENSIDADE = "densidade_espacial"
+CHAVES = {"df_ano": CHAVES_ANO, "df_bairro": CHAVES_BAIRRO, "df_local": CHAVES_LOCAL,
+          SERIES: ["segmento", "chave", "year"], DENSIDADE: ["celula", "primary_type", "year"]}
+TOTAIS = {"df_ano": "total_crimes", "df_bairro": "total", "df_local": "total", SERIES: "total_crimes",
+          DENSIDADE: "total"}
+
+# Incrementar sempre que os arquivos do estado mudarem de formato; um estado
+# de outra versão é reconstruído a partir do CSV completo
+VERSAO_ESTADO = "2"
+
+COLUNAS_REGISTRO = (["unique_key", "updated_on"] + [c for c in COLUNAS_AGREGADOS if c != "date"]
+                    + ["latitude", "longitude"])
+TAMANHO_FAIXA = 1_000_000
+# Linhas por leitura das partes de uma faixa na carga inicial
+LINHAS_LOTE = 100_000
+SUFIXO_PENDENTE = ".pendente"
+
+
+def _ler_registros(caminho, tamanho_bloco):
+    """Blocos do CSV só com as colunas necessárias e ``updated_on`` convertido."""
+    for bloco in ler_csv_em_blocos(caminho, COLUNAS_REGISTRO + ["date"], tamanho_bloco):
+        bloco["updated_on"] = pd.to_datetime(bloco["updated_on"], format=FORMATO_DATA, errors="coerce")
+        for coluna in ["primary_type", "description", "location_description"]:
+            bloco[coluna] = bloco[coluna].astype("str")
+        for coluna in ["latitude", "longitude"]:
+            bloco[coluna] = converter_coordenada(bloco[coluna])
+        yield bloco[COLUNAS_REGISTRO]
+
+
+def _como_serie(df, nome):
+    return df.set_index(CHAVES[nome])[TOTAIS[nome]]
+
+
+def _contagens(registros):
+    """Contagens de um conjunto de registros: os três agregados, as séries e a densidade."""
+    if registros.empty:
+        return None, None, None, None, None
+    pontos = filtrar_pontos(registros["latitude"], registros["longitude"],
+                            registros["primary_type"], registros["year"])
+    return (*contar_agregados(registros), _como_serie(finalizar_series(contar_series(registros)), SERIES),
+            contar_celulas(pontos))
+
+
+def _finalizar(ano, bairro, local, series, densidade):
+    df_ano, df_bairro, df_local = finalizar_agregados(ano, bairro, local)
+    df_series = series.astype("int64").reset_index()
+    df_densidade = densidade.astype("int64").reset_index()
+    return {"df_ano": df_ano, "df_bairro": df_bairro, "df_local": df_local, SERIES: df_series,
+            DENSIDADE: df_densidade}
+
+
+def _ajustar(atual, parcial, sinal):
+    if parcial is None or parcial.empty:
+        return atual
+    ajustado = acumular_contagens(atual, sinal * parcial)
+    return ajustado[ajustado != 0]
+
+
+class EstadoIncremental:
+    def __init__(self, pasta, tamanho_bloco=TAMANHO_BLOCO):
+        self.pasta = pasta
+        self.tamanho_bloco = tamanho_bloco
+        self.pasta_registros = os.path.join(pasta, "registros")
+        self._caminho_estado = os.path.join(pasta, "estado.json")
+        self.estado = self._ler_estado()
+        self._recuperar()
+
+    @property
+    def inicializado(self):
+        return bool(self.estado.get("marca_dagua"))
+
+    @property
+    def marca_dagua(self):
+        return pd.Timestamp(self.estado["marca_dagua"]) if self.inicializado else None
+
+    @property
+    def total_registros(self):
+        """Número de ``unique_key`` distintas no estado."""
+        return self.estado.get("total_registros")
+
+    @property
+    def versao(self):
+        return self.estado.get("versao")
+
+    @property
+    def fonte(self):
+        """Hash do CSV completo a partir do qual o estado foi inicializado."""
+        return self.estado.get("fonte")
+
+    def _ler_estado(self):
+        try:
+            with open(self._caminho_estado, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _gravar_estado(self):
+        temporario = self._caminho_estado + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, indent=2)
+        os.replace(temporario, self._caminho_estado)
+
+    # --------------------------------------------------
+    # Gravação em duas fases
+    # --------------------------------------------------
+    def _gravar_pendente(self, df, relativo):
+        """Grava ``df`` ao lado do destino, com o sufixo de pendente."""
+        df.to_parquet(os.path.join(self.pasta, relativo) + SUFIXO_PENDENTE, index=False)
+        return relativo
+
+    def _confirmar(self, pendentes):
+        """Registra os pendentes no ``estado.json`` (ponto de confirmação) e os move para o lugar."""
+        self.estado["pendentes"] = list(pendentes)
+        self._gravar_estado()
+        self._aplicar_pendentes()
+
+    def _aplicar_pendentes(self):
+        for relativo in self.estado.pop("pendentes", []):
+            destino = os.path.join(self.pasta, relativo)
+            if os.path.exists(destino + SUFIXO_PENDENTE):
+                os.replace(destino + SUFIXO_PENDENTE, destino)
+        self._gravar_estado()
+
+    def _recuperar(self):
+        """Conclui uma gravação já confirmada ou descarta uma interrompida antes disso."""
+        if self.estado.get("pendentes"):
+            logging.info("♻️ Concluindo atualização incremental interrompida")
+            self._aplicar_pendentes()
+        for pasta in (self.pasta, self.pasta_registros):
+            if os.path.isdir(pasta):
+                for nome in os.listdir(pasta):
+                    if nome.endswith(SUFIXO_PENDENTE):
+                        os.remove(os.path.join(pasta, nome))
+
+    # --------------------------------------------------
+    # Leitura
+    # --------------------------------------------------
+    def _caminho_faixa(self, faixa):
+        return os.path.join(self.pasta_registros, f"faixa_{int(faixa):04d}.parquet")
+
+    def agregados(self):
+        """Os três agregados atuais (``df_ano``, ``df_bairro``, ``df_local``)."""
+        return tuple(pd.read_parquet(os.path.join(self.pasta, f"{nome}.parquet")) for nome in NOMES)
+
+    def series_anuais(self):
+        """Contagens ``year`` x segmento, no formato de ``carregar_series_anuais``."""
+        return pd.read_parquet(os.path.join(self.pasta, f"{SERIES}.parquet"))
+
+    def densidade_espacial(self):
+        """Ocorrências por ``celula``, ``primary_type`` e ``year``, para ``GradeEspacial.de_contagens``."""
+        return pd.read_parquet(os.path.join(self.pasta, f"{DENSIDADE}.parquet"))
+
+    def assinatura(self, nomes=NOMES):
+        """Hash combinado de ``nomes`` (agregados, ``series_anuais``,
+        ``densidade_espacial`` ou ``registros``), usado como chave do cache
+        colunar."""
+        return "|".join(self.estado.get("hashes", {}).get(nome, "") for nome in nomes)
+
+    # --------------------------------------------------
+    # Atualização
+    # --------------------------------------------------
+    def _gravar_agregados(self, frames):
+        alterados, pendentes = set(), []
+        hashes = self.estado.setdefault("hashes", {})
+        for nome, df in frames.items():
+            df = df.sort_values(CHAVES[nome], kind="stable").reset_index(drop=True)
+            assinatura = hash_dados(df)
+            if hashes.get(nome) != assinatura:
+                pendentes.append(self._gravar_pendente(df, f"{nome}.parquet"))
+                hashes[nome] = assinatura
+                alterados.add(nome)
+        return alterados, pendentes
+
+    def _gravar_registros(self, registros):
+        """Regrava, por faixa de ``unique_key``, os registros informados."""
+        os.makedirs(self.pasta_registros, exist_ok=True)
+        faixas = self.estado.setdefault("faixas", {})
+        pendentes = []
+        for faixa, parte in registros.groupby(registros["unique_key"] // TAMANHO_FAIXA):
+            parte = parte.reset_index(drop=True)
+            relativo = os.path.relpath(self._caminho_faixa(faixa), self.pasta)
+            pendentes.append(self._gravar_pendente(parte, relativo))
+            faixas[relativo] = hash_arquivo(os.path.join(self.pasta, relativo) + SUFIXO_PENDENTE)
+        self.estado.setdefault("hashes", {})["registros"] = hash_dados(faixas)
+        return pendentes
+
+    def _consolidar_faixa(self, faixa, caminhos, contagens):
+        """Grava a faixa com a versão mais recente de cada ``unique_key`` e soma as contagens.
+
+        Só ``unique_key`` e ``updated_on`` das partes são lidos juntos; os
+        registros vencedores são gravados e contados em lotes de
+        ``LINHAS_LOTE`` linhas.
+        """
+        chaves = pd.concat([
+            pd.read_parquet(caminho, columns=["unique_key", "updated_on"]).assign(parte=i)
+            for i, caminho in enumerate(caminhos)
+        ])
+        chaves["linha"] = chaves.index
+        # Ordenação estável: no empate de updated_on vence o que vem depois no CSV
+        vencedores = chaves.sort_values("updated_on", kind="stable").drop_duplicates("unique_key", keep="last")
+        linhas = vencedores.groupby("parte")["linha"]
+
+        relativo = os.path.relpath(self._caminho_faixa(faixa), self.pasta)
+        destino = os.path.join(self.pasta, relativo) + SUFIXO_PENDENTE
+        escritor = None
+        for i, caminho in enumerate(caminhos):
+            if i not in linhas.groups:
+                continue
+            manter = np.sort(linhas.get_group(i).to_numpy())
+            inicio = 0
+            for lote in pq.ParquetFile(caminho).iter_batches(batch_size=LINHAS_LOTE):
+                fim = inicio + lote.num_rows
+                selecao = manter[np.searchsorted(manter, inicio):np.searchsorted(manter, fim)] - inicio
+                inicio = fim
+                tabela = pa.Table.from_batches([lote]).take(pa.array(selecao))
+                if escritor is None:
+                    escritor = pq.ParquetWriter(destino, tabela.schema)
+                escritor.write_table(tabela.cast(escritor.schema))
+                contagens = [acumular_contagens(a, p) for a, p in zip(contagens, _contagens(tabela.to_pandas()))]
+        escritor.close()
+
+        self.estado.setdefault("faixas", {})[relativo] = hash_arquivo(destino)
+        return relativo, len(vencedores), vencedores["updated_on"].max(), contagens
+
+    def inicializar(self, caminho_csv, fonte=None):
+        """Carga completa do histórico: agregados, séries, registros e marca d'água.
+
+        O CSV é lido em blocos e repartido em disco por faixa de
+        ``unique_key``; cada faixa é então deduplicada e contada sozinha, de
+        modo que a memória depende do tamanho do bloco e da faixa, não do
+        histórico. ``fonte`` é o hash de ``caminho_csv``; se omitido, é
+        calculado aqui.
+        """
+        logging.info(f"🗂️ Inicializando estado incremental a partir de {caminho_csv}")
+        os.makedirs(self.pasta, exist_ok=True)
+        # Estado vazio primeiro: uma carga interrompida recomeça do zero
+        self.estado = {}
+        self._gravar_estado()
+        shutil.rmtree(self.pasta_registros, ignore_errors=True)
+        pasta_partes = os.path.join(self.pasta_registros, "partes")
+        os.makedirs(pasta_partes)
+
+        partes = {}
+        for numero, bloco in enumerate(_ler_registros(caminho_csv, self.tamanho_bloco)):
+            for faixa, parte in bloco.groupby(bloco["unique_key"] // TAMANHO_FAIXA):
+                caminho = os.path.join(pasta_partes, f"faixa_{int(faixa):04d}_{numero:05d}.parquet")
+                parte.to_parquet(caminho, index=False)
+                partes.setdefault(faixa, []).append(caminho)
+
+        pendentes, contagens, total, marcas = [], [None] * 5, 0, []
+        for faixa in sorted(partes):
+            relativo, n, marca, contagens = self._consolidar_faixa(faixa, partes[faixa], contagens)
+            pendentes.append(relativo)
+            total += n
+            marcas.append(marca)
+        shutil.rmtree(pasta_partes)
+        self.estado.setdefault("hashes", {})["registros"] = hash_dados(self.estado.get("faixas", {}))
+
+        alterados, agregados = self._gravar_agregados(_finalizar(*contagens))
+        self.estado["marca_dagua"] = max(marcas).isoformat()
+        self.estado["total_registros"] = total
+        self.estado["fonte"] = fonte or hash_arquivo(caminho_csv)
+        self.estado["versao"] = VERSAO_ESTADO
+        self._confirmar(pendentes + agregados)
+        return alterados
+
+    def atualizar(self, caminho_delta):
+        """Incorpora um export parcial e devolve os agregados que mudaram."""
+        if not self.inicializado:
+            raise RuntimeError("Estado incremental não inicializado: chame inicializar() antes")
+
+        novos = pd.concat(list(_ler_registros(caminho_delta, self.tamanho_bloco)), ignore_index=True)
+        novos = novos[novos["updated_on"] > self.marca_dagua]
+        novos = novos.sort_values("updated_on").drop_duplicates("unique_key", keep="last")
+        if novos.empty:
+            logging.info("✅ Nenhum registro mais novo que a marca d'água")
+            return set()
+
+        # Contribuições antigas das unique_key reenviadas, só nas faixas tocadas
+        faixas = novos["unique_key"] // TAMANHO_FAIXA
+        registros_faixas = {}
+        antigos = []
+        for faixa in faixas.unique():
+            caminho = self._caminho_faixa(faixa)
+            existentes = pd.read_parquet(caminho) if os.path.exists(caminho) else novos.iloc[:0]
+            registros_faixas[faixa] = existentes
+            antigos.append(existentes[existentes["unique_key"].isin(novos["unique_key"])])
+        antigos = pd.concat(antigos, ignore_index=True)
+
+        atuais = [_como_serie(df, nome) for nome, df in zip(NOMES, self.agregados())]
+        atuais.append(_como_serie(self.series_anuais(), SERIES))
+        atuais.append(_como_serie(self.densidade_espacial(), DENSIDADE))
+        ajustados = [
+            _ajustar(_ajustar(atual, r, -1), s, +1)
+            for atual, r, s in zip(atuais, _contagens(antigos), _contagens(novos))
+        ]
+        alterados, pendentes = self._gravar_agregados(_finalizar(*ajustados))
+
+        atualizados = pd.concat([
+            pd.concat([existentes[~existentes["unique_key"].isin(novos["unique_key"])],
+                       novos[faixas == faixa]], ignore_index=True)
+            for faixa, existentes in registros_faixas.items()
+        ], ignore_index=True)
+        pendentes += self._gravar_registros(atualizados)
+
+        self.estado["marca_dagua"] = novos["updated_on"].max().isoformat()
+        if self.total_registros is not None:
+            self.estado["total_registros"] = self.total_registros + len(novos) - len(antigos)
+        self._confirmar(pendentes)
+        logging.info(
+            f"✅ Delta incorporado: {len(novos):,} registros "
+            f"({len(antigos):,} atualizações), alterados: {', '.join(sorted(alterados)) or 'nenhum'}"
+        )
+        return alterados
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura em streaming do arquivo bruto "Crimes em Chicago.csv".
+
+O CSV exportado do portal de Chicago é lido em blocos de tamanho fixo, com
+dtypes compactos e categorias, e os três agregados usados pelo restante do
+pipeline (ano x tipo, tipo x bairro e tipo x ano x local) são montados numa
+única passada. A memória de pico depende do tamanho do bloco e da
+cardinalidade dos agregados, não do número de linhas do arquivo.
+"""
+
+import logging
+
+import pandas as pd
+
+TAMANHO_BLOCO = 500_000
+
+# Formato das datas do export ("06/01/2021 21:30:00")
+FORMATO_DATA = "%d/%m/%Y %H:%M:%S"
+
+DTYPES_CSV = {
+    "unique_key": "int64",
+    "primary_type": "category",
+    "description": "category",
+    "location_description": "category",
+    "arrest": "boolean",
+    "domestic": "boolean",
+    "beat": "Int16",
+    "district": "Int8",
+    "ward": "Int8",
+    "community_area": "Int8",
+    "year": "Int16",
+}
+
+COLUNAS_AGREGADOS = [
+    "date", "primary_type", "description", "location_description",
+    "arrest", "domestic", "ward", "community_area", "year",
+]
+
+# Chaves de cada agregado, na mesma ordem de colunas das planilhas originais
+CHAVES_ANO = ["year", "primary_type"]
+CHAVES_BAIRRO = ["ward", "community_area", "primary_type", "description", "arrest"]
+CHAVES_LOCAL = ["location_description", "primary_type", "arrest", "domestic", "year"]
+
+# Segmentos das séries anuais usadas na projeção por segmento
+SEGMENTOS_SERIES = ("primary_type", "community_area", "ward")
+
+
+def ler_csv_em_blocos(caminho, colunas=None, tamanho_bloco=TAMANHO_BLOCO):
+    """Itera sobre o CSV bruto em blocos já tipados.
+
+    Latitude/longitude usam vírgula como separador decimal, por isso o
+    arquivo é lido com ``decimal=","``; os campos de data continuam como
+    texto e são convertidos sob demanda com ``FORMATO_DATA``.
+    """
+    dtypes = {c: t for c, t in DTYPES_CSV.items() if colunas is None or c in colunas}
+    leitor = pd.read_csv(
+        caminho,
+        usecols=colunas,
+        dtype=dtypes,
+        decimal=",",
+        chunksize=tamanho_bloco,
+    )
+    for bloco in leitor:
+        if "year" in bloco.columns and bloco["year"].isna().any():
+            ano_data = pd.to_datetime(bloco["date"], format=FORMATO_DATA, errors="coerce").dt.year
+            bloco["year"] = bloco["year"].fillna(ano_data.astype("Int16"))
+        yield bloco
+
+
+def _contar(bloco, chaves, dropna):
+    return bloco.groupby(chaves, observed=True, dropna=dropna).size()
+
+
+def acumular_contagens(acumulado, parcial):
+    """Soma contagens parciais alinhando pelos valores das chaves, inclusive os nulos."""
+    if acumulado is None:
+        return parcial
+    # ``add`` não alinha chaves nulas (df_local conta com dropna=False) e avisa
+    # ao ordenar categorias com NaN; o groupby trata o nulo como uma chave
+    juntos = pd.concat([acumulado, parcial])
+    return juntos.groupby(level=list(range(juntos.index.nlevels)), dropna=False, observed=True).sum()
+
+
+def _finalizar(serie, nome_total, dtypes):
+    df = serie.astype("int64").rename(nome_total).reset_index()
+    for coluna, tipo in dtypes.items():
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype(tipo)
+    return df
+
+
+def contar_agregados(bloco):
+    """Contagens parciais (ano, bairro, local) de um bloco de registros."""
+    return (
+        _contar(bloco, CHAVES_ANO, dropna=True),
+        _contar(bloco, CHAVES_BAIRRO, dropna=True),
+        _contar(bloco, CHAVES_LOCAL, dropna=False),
+    )
+
+
+def finalizar_agregados(ano, bairro, local):
+    """Converte as contagens acumuladas nos três DataFrames do pipeline."""
+    df_ano = _finalizar(ano, "total_crimes", {"year": "int64", "primary_type": "str"})
+    df_bairro = _finalizar(bairro, "total", {
+        "ward": "int64", "community_area": "int64", "primary_type": "str",
+        "description": "str", "arrest": "boolean",
+    })
+    # df_local mantém as chaves nulas: prisão/doméstico ausentes ficam <NA>
+    df_local = _finalizar(local, "total", {
+        "location_description": "str", "primary_type": "str",
+        "arrest": "boolean", "domestic": "boolean", "year": "Int64",
+    })
+    return df_ano, df_bairro, df_local
+
+
+def agregar_csv(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """``df_ano``, ``df_bairro``, ``df_local`` e o número de registros lidos do CSV bruto.
+
+    O número de registros vem da leitura, não dos agregados, e serve para
+    conferir os totais do modelo estrela.
+    """
+    logging.info(f"Lendo CSV bruto em blocos de {tamanho_bloco:,} linhas: {caminho}")
+    ano = bairro = local = None
+    linhas = 0
+
+    for bloco in ler_csv_em_blocos(caminho, COLUNAS_AGREGADOS, tamanho_bloco):
+        linhas += len(bloco)
+        # Cada bloco tem suas próprias categorias; a soma alinha os
+        # agregados parciais pelos valores das chaves, não pelos códigos.
+        parcial_ano, parcial_bairro, parcial_local = contar_agregados(bloco)
+        ano = acumular_contagens(ano, parcial_ano)
+        bairro = acumular_contagens(bairro, parcial_bairro)
+        local = acumular_contagens(local, parcial_local)
+
+    if linhas == 0:
+        raise ValueError(f"CSV sem registros: {caminho}")
+
+    logging.info(f"✅ {linhas:,} registros agregados do CSV bruto")
+    return (*finalizar_agregados(ano, bairro, local), linhas)
+
+
+def carregar_dados_csv(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """Monta ``df_ano``, ``df_bairro`` e ``df_local`` a partir do CSV bruto.
+
+    Os DataFrames saem no mesmo formato das planilhas
+    ``Crimes_po_ano_tipo``, ``Crimes_por_bairro`` e ``Local_dos_crimes``.
+    """
+    return agregar_csv(caminho, tamanho_bloco)[:3]
+
+
+def contar_series(bloco, segmentos=SEGMENTOS_SERIES):
+    """Contagens parciais ``year`` x segmento de um bloco de registros."""
+    return {segmento: _contar(bloco, ["year", segmento], dropna=True) for segmento in segmentos}
+
+
+def finalizar_series(contagens):
+    """Converte as contagens por segmento no formato longo das séries anuais."""
+    partes = []
+    for segmento, serie in contagens.items():
+        if serie is None:
+            continue
+        df = serie.astype("int64").rename("total_crimes").reset_index()
+        partes.append(pd.DataFrame({
+            "segmento": segmento,
+            "chave": df[segmento].astype(str),
+            "year": df["year"].astype("int64"),
+            "total_crimes": df["total_crimes"],
+        }))
+    return pd.concat(partes, ignore_index=True)
+
+
+def carregar_series_anuais(caminho, segmentos=SEGMENTOS_SERIES, tamanho_bloco=TAMANHO_BLOCO):
+    """Contagem anual por segmento, em formato longo, a partir do CSV bruto.
+
+    O resultado tem as colunas ``segmento`` (nome da coluna de origem),
+    ``chave`` (valor do segmento, como texto), ``year`` e ``total_crimes`` e
+    alimenta a projeção por segmento.
+    """
+    colunas = ["date", "year"] + list(segmentos)
+    contagens = {segmento: None for segmento in segmentos}
+
+    for bloco in ler_csv_em_blocos(caminho, colunas, tamanho_bloco):
+        for segmento, parcial in contar_series(bloco, segmentos).items():
+            contagens[segmento] = acumular_contagens(contagens[segmento], parcial)
+
+    if all(serie is None for serie in contagens.values()):
+        raise ValueError(f"CSV sem registros: {caminho}")
+    return finalizar_series(contagens)
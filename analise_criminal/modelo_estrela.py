@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo estrela (fato + dimensões) para os três agregados de crimes.
+
+O cruzamento antigo juntava ``df_ano`` com ``df_bairro`` só por
+``primary_type`` e depois com ``df_local`` por ``(primary_type, year)``: cada
+linha anual era repetida para todos os bairros e locais do mesmo tipo, e os
+``groupby`` seguintes somavam ``total_crimes`` duplicado.
+
+Aqui os três agregados são empilhados numa única tabela fato, cada linha
+marcada com a granularidade (``origem``) de onde veio. As chaves viram
+códigos inteiros apontando para tabelas de dimensão pequenas, e cada consulta
+é respondida pela granularidade que contém todas as dimensões pedidas, sem
+produto cartesiano.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Dimensões disponíveis em cada granularidade, por ordem de preferência
+GRANULARIDADES = {
+    "ano": ["year", "primary_type"],
+    "local": ["location_description", "primary_type", "arrest", "domestic", "year"],
+    "bairro": ["ward", "community_area", "primary_type", "description", "arrest"],
+}
+
+DIMENSOES = [
+    "primary_type", "year", "location_description", "ward",
+    "community_area", "description", "arrest", "domestic",
+]
+
+DTYPES_DIMENSOES = {
+    "primary_type": "str",
+    "year": "Int64",
+    "location_description": "str",
+    "ward": "Int64",
+    "community_area": "Int64",
+    "description": "str",
+    "arrest": "boolean",
+    "domestic": "boolean",
+}
+
+
+def integrar_agregados(df_ano, df_bairro, df_local):
+    """Empilha os três agregados numa tabela longa com a coluna ``origem``.
+
+    O número de linhas é a soma das linhas das entradas. As dimensões que
+    não existem numa granularidade ficam nulas.
+    """
+    entradas = {
+        "ano": df_ano.rename(columns={"total_crimes": "total"}),
+        "bairro": df_bairro,
+        "local": df_local,
+    }
+    partes = [
+        df[GRANULARIDADES[origem] + ["total"]].assign(origem=origem)
+        for origem, df in entradas.items()
+        if not df.empty
+    ]
+    tabela = pd.concat(partes, ignore_index=True)
+    for coluna in DIMENSOES:
+        if coluna not in tabela.columns:
+            tabela[coluna] = pd.NA
+    tabela = tabela.astype(DTYPES_DIMENSOES)
+    tabela["total"] = tabela["total"].astype("int64")
+    return tabela[["origem"] + DIMENSOES + ["total"]].rename(columns={"total": "total_crimes"})
+
+
+class ModeloEstrela:
+    """Tabela fato com chaves inteiras e uma dimensão por coluna categórica.
+
+    ``fato`` tem uma coluna ``int32`` por dimensão (``-1`` quando a dimensão
+    não existe naquela granularidade), a coluna ``origem`` e ``total_crimes``.
+    ``dimensoes[nome]`` é o índice com os valores de cada código.
+    """
+
+    def __init__(self, tabela):
+        self.dimensoes = {}
+        colunas = {"origem": tabela["origem"].astype("category")}
+        for dimensao in DIMENSOES:
+            codigos, valores = pd.factorize(tabela[dimensao], sort=True, use_na_sentinel=True)
+            colunas[dimensao] = codigos.astype(np.int32)
+            self.dimensoes[dimensao] = valores
+        colunas["total_crimes"] = tabela["total_crimes"].to_numpy(dtype=np.int64)
+        self.fato = pd.DataFrame(colunas)
+
+    @classmethod
+    def a_partir_dos_agregados(cls, df_ano, df_bairro, df_local):
+        return cls(integrar_agregados(df_ano, df_bairro, df_local))
+
+    def dimensao(self, nome):
+        """Tabela de dimensão ``(codigo, valor)``."""
+        valores = self.dimensoes[nome]
+        return pd.DataFrame({"codigo": np.arange(len(valores), dtype=np.int32), nome: valores})
+
+    def granularidade_para(self, por):
+        """Primeira granularidade que contém todas as dimensões de ``por``."""
+        for origem, dims in GRANULARIDADES.items():
+            if origem in self.fato["origem"].cat.categories and set(por) <= set(dims):
+                return origem
+        raise ValueError(f"Nenhuma granularidade contém as dimensões {list(por)}")
+
+    def _codigos_filtro(self, dimensao, valores):
+        if not isinstance(valores, (list, tuple, set, np.ndarray, pd.Index)):
+            valores = [valores]
+        codigos = self.dimensoes[dimensao].get_indexer(list(valores))
+        return codigos[codigos >= 0]
+
+    def agregar(self, por, filtros=None, origem=None):
+        """Soma ``total_crimes`` agrupando pelas dimensões de ``por``.
+
+        ``filtros`` é um dicionário ``dimensão -> valor ou lista de valores``.
+        A granularidade é escolhida automaticamente, a menos que ``origem``
+        seja informada. O resultado tem as dimensões decodificadas e a
+        coluna ``total_crimes``.
+        """
+        por = list(por)
+        filtros = filtros or {}
+        origem = origem or self.granularidade_para(por + list(filtros))
+        fato = self.fato[self.fato["origem"] == origem]
+
+        for dimensao, valores in filtros.items():
+            fato = fato[fato[dimensao].isin(self._codigos_filtro(dimensao, valores))]
+
+        if not por:
+            return pd.DataFrame({"total_crimes": [int(fato["total_crimes"].sum())]})
+
+        # Linhas com a chave nula (-1) são mantidas, como no groupby original
+        resultado = fato.groupby(por, sort=True)["total_crimes"].sum().reset_index()
+        for dimensao in por:
+            codigos = resultado[dimensao].to_numpy()
+            if len(self.dimensoes[dimensao]) == 0:
+                resultado[dimensao] = pd.Series(pd.NA, index=resultado.index, dtype=DTYPES_DIMENSOES[dimensao])
+                continue
+            valores = self.dimensoes[dimensao].take(np.where(codigos >= 0, codigos, 0))
+            resultado[dimensao] = pd.Series(valores, index=resultado.index).where(codigos >= 0)
+            resultado[dimensao] = resultado[dimensao].astype(DTYPES_DIMENSOES[dimensao])
+        return resultado
+
+    def serie(self, dimensao, **kwargs):
+        """Atalho para ``agregar([dimensao])`` como ``Series`` indexada."""
+        return self.agregar([dimensao], **kwargs).set_index(dimensao)["total_crimes"]
+
+    def verificar_totais(self, total_registros=None):
+        """Confere os totais do modelo entre granularidades e contra os registros lidos.
+
+        ``local`` conta todas as ocorrências, com chaves nulas inclusive, então
+        o seu total tem de ser igual a ``total_registros`` (quando informado).
+        Por tipo, ``local`` restrito aos anos conhecidos tem de bater com
+        ``ano``, e ``bairro`` não pode passar de ``ano``; pode ficar abaixo,
+        pois não inclui ocorrências sem ``ward``. Qualquer divergência levanta
+        ``ValueError``. Devolve os totais por tipo de cada granularidade e a
+        coluna ``consistente``.
+        """
+        presentes = set(self.fato["origem"].unique())
+        colunas = {}
+        for origem in GRANULARIDADES:
+            if origem not in presentes:
+                continue
+            if origem == "local":
+                por_ano = self.agregar(["primary_type", "year"], origem=origem)
+                # Sem ano conhecido (nulo ou 0) a ocorrência não entra em ``ano``
+                por_ano = por_ano[por_ano["year"].fillna(0) > 0]
+                serie = por_ano.groupby("primary_type")["total_crimes"].sum()
+            else:
+                serie = self.serie("primary_type", origem=origem)
+            colunas[origem] = serie[serie.index.notna()]
+
+        conferencia = pd.DataFrame(colunas).fillna(0).astype("int64")
+        referencia = conferencia.get("ano", conferencia.max(axis=1))
+        conferencia["consistente"] = (
+            conferencia.get("local", referencia).eq(referencia)
+            & conferencia.get("bairro", referencia).le(referencia)
+        )
+
+        problemas = []
+        if total_registros is not None and "local" in presentes:
+            total_local = int(self.fato.loc[self.fato["origem"] == "local", "total_crimes"].sum())
+            if total_local != total_registros:
+                problemas.append(f"o total de 'local' ({total_local:,}) difere dos "
+                                 f"{total_registros:,} registros lidos")
+        if not conferencia["consistente"].all():
+            tipos = conferencia.index[~conferencia["consistente"]]
+            problemas.append(f"totais diferentes entre granularidades para: {', '.join(map(str, tipos))}")
+        if problemas:
+            raise ValueError(f"Conferência de totais falhou: {'; '.join(problemas)}")
+
+        origem_registros = f" e os {total_registros:,} registros lidos" if total_registros is not None else ""
+        logging.info(f"✅ Totais conferidos entre {', '.join(colunas)}{origem_registros}")
+        return conferencia
@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+"""
+Execução das etapas da análise como um grafo de dependências (DAG).
+
+Cada ``Etapa`` declara de quais outras depende; ``executar`` recebe as
+etapas desejadas, inclui automaticamente as dependências e roda em paralelo
+(threads) as que já estão liberadas. pandas, NumPy, pyarrow e o parser de
+CSV liberam o GIL nas partes pesadas, e os dados ficam compartilhados entre
+as etapas sem cópia. Etapas ``exclusivas`` (a renderização, que já ocupa
+todos os núcleos com o seu próprio pool de processos) rodam sozinhas.
+
+Para cada etapa são medidos o tempo e a memória residente (RSS) do processo
+no início e no pico durante a execução, amostrada por uma thread auxiliar.
+Com etapas simultâneas o pico é do processo inteiro; use ``paralelo=False``
+para medir cada etapa isoladamente. O RSS vem de ``/proc`` no Linux, do
+psutil se instalado ou da API do Windows; sem nenhum deles (macOS sem
+psutil) as colunas de memória ficam ``None``.
+"""
+
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from analise_criminal.cache import CacheColunar
+from analise_criminal.configuracao import configuracao_padrao
+
+Etapa = namedtuple("Etapa", ["nome", "funcao", "dependencias", "descricao", "exclusiva"],
+                   defaults=((), "", False))
+
+# Contexto compartilhado pelas funções das etapas
+Contexto = namedtuple("Contexto", ["cfg", "cache"])
+
+INTERVALO_AMOSTRAGEM = 0.02  # segundos
+MAX_PARALELAS = 4
+_MB = 1024 ** 2
+
+
+# ======================================================
+# MEMÓRIA
+# ======================================================
+def _leitor_rss_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class ContadoresMemoria(ctypes.Structure):  # PROCESS_MEMORY_COUNTERS
+        _fields_ = [
+            ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    kernel32, psapi = ctypes.WinDLL("kernel32"), ctypes.WinDLL("psapi")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ContadoresMemoria), wintypes.DWORD]
+    psapi.GetProcessMemoryInfo.restype = wintypes.BOOL
+    processo = kernel32.GetCurrentProcess()
+
+    def ler():
+        contadores = ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        if not psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+            return None
+        return contadores.WorkingSetSize
+
+    return ler
+
+
+@functools.lru_cache(maxsize=None)
+def _leitor_rss():
+    """Função que lê o RSS atual nesta plataforma, ou ``None`` se não houver."""
+    if os.path.exists("/proc/self/statm"):
+        pagina = os.sysconf("SC_PAGE_SIZE")
+
+        def ler():
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * pagina
+
+        return ler
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        processo = psutil.Process()
+        return lambda: processo.memory_info().rss
+    if sys.platform == "win32":
+        try:
+            return _leitor_rss_windows()
+        except (OSError, AttributeError):
+            return None
+    # macOS/BSD sem psutil: só há ru_maxrss, que é o pico de toda a vida do
+    # processo e não o RSS atual; medir etapas com ele não faz sentido
+    logging.warning("⚠️ Memória residente indisponível nesta plataforma (instale psutil); "
+                    "as etapas serão medidas só em tempo")
+    return None
+
+
+def memoria_rss():
+    """Memória residente atual do processo, em bytes, ou ``None`` se a
+    plataforma não permite medi-la."""
+    leitor = _leitor_rss()
+    if leitor is None:
+        return None
+    try:
+        return leitor()
+    except (OSError, ValueError):
+        return None
+
+
+def _mb(valor):
+    return None if valor is None else valor / _MB
+
+
+class MonitorMemoria:
+    """Amostra o RSS em segundo plano e guarda o pico de cada etapa ativa.
+
+    Sem leitura de RSS na plataforma, ``iniciar`` e ``finalizar`` devolvem
+    ``None`` e nenhuma thread é iniciada.
+    """
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self._picos = {}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def __enter__(self):
+        if memoria_rss() is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _registrar(self, rss):
+        if rss is None:
+            return
+        with self._trava:
+            for nome, pico in self._picos.items():
+                if pico is None or rss > pico:
+                    self._picos[nome] = rss
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self._registrar(memoria_rss())
+
+    def iniciar(self, nome):
+        rss = memoria_rss()
+        with self._trava:
+            self._picos[nome] = rss
+        return rss
+
+    def finalizar(self, nome):
+        self._registrar(memoria_rss())
+        with self._trava:
+            return self._picos.pop(nome, None)
+
+
+# ======================================================
+# ETAPAS
+# ======================================================
+def _estado(ctx, r):
+    from analise_criminal.etapas import preparar_estado
+
+    return preparar_estado(ctx.cfg, ctx.cache)
+
+
+def _carregar(ctx, r):
+    from analise_criminal.etapas import carregar_dados, mostrar_amostra
+
+    print("\n📥 CARREGAMENTO DE DADOS".center(100))
+    df_ano, df_bairro, df_local, total_registros = carregar_dados(ctx.cfg, ctx.cache, r["estado"])
+    mostrar_amostra(df_ano, "Dados Anuais")
+    mostrar_amostra(df_bairro, "Dados por Bairro")
+    mostrar_amostra(df_local, "Dados de Localização")
+    return {"df_ano": df_ano, "df_bairro": df_bairro, "df_local": df_local,
+            "total_registros": total_registros}
+
+
+def _cruzar(ctx, r):
+    from analise_criminal.etapas import cruzar_dados, mostrar_amostra
+
+    dados = r["carregar"]
+    merged, modelo, conferencia = cruzar_dados(dados["df_ano"], dados["df_bairro"], dados["df_local"],
+                                               ctx.cache, dados["total_registros"])
+    mostrar_amostra(merged, "Dados Cruzados")
+    mostrar_amostra(conferencia.reset_index(), "Conferência de Totais", n=len(conferencia))
+    return {"merged": merged, "modelo": modelo, "conferencia_totais": conferencia}
+
+
+def _analisar(ctx, r):
+    from analise_criminal.etapas import analise_completa
+
+    return analise_completa(r["cruzar"]["modelo"])
+
+
+def _explorar(ctx, r):
+    from analise_criminal.etapas import analise_exploratoria
+
+    exploratorios, graficos = analise_exploratoria(r["cruzar"]["modelo"])
+    return {"exploratorios": exploratorios, "graficos": graficos}
+
+
+def _espacial(ctx, r):
+    from analise_criminal.etapas import analise_espacial
+
+    hotspots, hotspots_tipo_ano, graficos = analise_espacial(ctx.cfg.arquivo_csv, ctx.cache, r["estado"])
+    return {"hotspots": hotspots, "hotspots_tipo_ano": hotspots_tipo_ano, "graficos": graficos}
+
+
+def _projetar(ctx, r):
+    from analise_criminal.etapas import (
+        carregar_series_segmentos, gerar_projecao_criminalidade, projetar_por_segmento,
+    )
+
+    print("\n🔮 Iniciando projeção da criminalidade...")
+    df_proj, grafico = gerar_projecao_criminalidade(r["cruzar"]["modelo"].agregar(["year"]))
+    print("\n🔮 Projetando séries por segmento...")
+    series = carregar_series_segmentos(ctx.cfg.arquivo_csv, ctx.cache, r["carregar"]["df_ano"],
+                                       r["estado"])
+    return {"projecao": df_proj, "projecao_segmentos": projetar_por_segmento(series),
+            "graficos": [grafico]}
+
+
+def _renderizar(ctx, r):
+    from tabulate import tabulate
+
+    from analise_criminal.renderizacao import renderizar_graficos
+
+    graficos = [g for nome in ("explorar", "espacial", "projetar") for g in r[nome]["graficos"]]
+    print("\n🖼️ Renderizando gráficos...")
+    tempos = renderizar_graficos(graficos, ctx.cfg.pasta_resultados)
+    print(tabulate(tempos[["grafico", "situacao", "segundos"]], headers='keys',
+                   tablefmt='psql', showindex=False, floatfmt=".2f"))
+    print(f"⏱️ Tempo total de renderização: {tempos['segundos'].sum():.2f}s")
+    return tempos
+
+
+def _exportar(ctx, r):
+    from analise_criminal.etapas import exportar_excel, montar_livros, unificar_dados
+
+    dados, cruzados, espacial = r["carregar"], r["cruzar"], r["espacial"]
+    # A base unificada parte da tabela integrada (merged)
+    df_merged = ctx.cache.obter("df_merged", lambda: unificar_dados(cruzados["merged"]),
+                                dependencias=["merged"])
+    livros = montar_livros(
+        ctx.cfg, dados["df_ano"], dados["df_bairro"], dados["df_local"],
+        cruzados["merged"], df_merged, r["analisar"],
+        r["projetar"]["projecao"], r["projetar"]["projecao_segmentos"],
+        espacial["hotspots"], espacial["hotspots_tipo_ano"],
+    )
+    return exportar_excel(livros, formato_lateral=ctx.cfg.formato_lateral)
+
+
+def _relatorio(ctx, r):
+    from analise_criminal.etapas import gerar_relatorio_pdf_completo
+
+    arquivo_pdf = os.path.join(ctx.cfg.pasta_resultados, "Relatorio_Completo.pdf")
+    houve_mudanca = (r["graficos"]["situacao"] == "renderizado").any() or bool(r["exportar"])
+    if ctx.cfg.modo_incremental and not houve_mudanca and os.path.exists(arquivo_pdf):
+        print("\n⏭️ Nenhum gráfico ou planilha mudou; relatório PDF mantido.")
+        return arquivo_pdf
+    return gerar_relatorio_pdf_completo(r["analisar"], ctx.cfg.pasta_resultados)
+
+
+ETAPAS = [
+    Etapa("estado", _estado, (), "Estado incremental: carga inicial e export diário (só com --incremental)"),
+    Etapa("carregar", _carregar, ("estado",), "Leitura do CSV bruto, do estado incremental ou das planilhas"),
+    Etapa("cruzar", _cruzar, ("carregar",), "Tabela integrada e conferência de totais"),
+    Etapa("analisar", _analisar, ("cruzar",), "Top crimes, locais e eficiência das prisões"),
+    Etapa("explorar", _explorar, ("cruzar",), "Análise exploratória e gráficos descritivos"),
+    Etapa("espacial", _espacial, ("estado",), "Grade espacial, hotspots e mapa de densidade"),
+    Etapa("projetar", _projetar, ("estado", "carregar", "cruzar"), "Projeções até 2030 (total e por segmento)"),
+    Etapa("graficos", _renderizar, ("explorar", "espacial", "projetar"),
+          "Renderização dos PNGs", exclusiva=True),
+    Etapa("exportar", _exportar, ("carregar", "cruzar", "analisar", "projetar", "espacial"),
+          "Livros Excel"),
+    Etapa("relatorio", _relatorio, ("analisar", "graficos", "exportar"), "Relatório PDF"),
+]
+
+
+# ======================================================
+# EXECUÇÃO
+# ======================================================
+def resolver_etapas(alvos=None, etapas=ETAPAS):
+    """Etapas necessárias para ``alvos`` (todas, se ``None``) em ordem topológica."""
+    por_nome = {e.nome: e for e in etapas}
+    alvos = list(por_nome) if not alvos else list(alvos)
+    desconhecidas = [a for a in alvos if a not in por_nome]
+    if desconhecidas:
+        raise ValueError(f"Etapas desconhecidas: {', '.join(desconhecidas)} "
+                         f"(disponíveis: {', '.join(por_nome)})")
+
+    ordem, visitando, visitadas = [], set(), set()
+
+    def visitar(nome):
+        if nome in visitadas:
+            return
+        if nome in visitando:
+            raise ValueError(f"Dependência circular envolvendo a etapa '{nome}'")
+        visitando.add(nome)
+        for dep in por_nome[nome].dependencias:
+            if dep not in por_nome:
+                raise ValueError(f"Etapa '{nome}' depende de '{dep}', que não existe")
+            visitar(dep)
+        visitando.discard(nome)
+        visitadas.add(nome)
+        ordem.append(por_nome[nome])
+
+    for alvo in alvos:
+        visitar(alvo)
+    return ordem
+
+
+def executar(alvos=None, cfg=None, paralelo=True, max_paralelas=None, etapas=ETAPAS, cache=None):
+    """Executa ``alvos`` e as suas dependências.
+
+    Devolve ``(resultados, tempos)``: o dicionário ``etapa -> resultado`` e
+    um DataFrame com ``etapa``, ``inicio_s``, ``segundos``,
+    ``memoria_inicial_mb``, ``memoria_pico_mb`` e ``memoria_delta_mb``.
+    Se uma etapa falhar, as que já estão rodando terminam e a exceção é
+    repassada.
+    """
+    cfg = cfg or configuracao_padrao()
+    os.makedirs(cfg.pasta_resultados, exist_ok=True)
+    if cache is None:
+        cache = CacheColunar(cfg.pasta_cache, ativo=cfg.usar_cache)
+    ctx = Contexto(cfg, cache)
+
+    plano = resolver_etapas(alvos, etapas)
+    resultados, medidas = {}, []
+    pendentes = {e.nome: e for e in plano}
+    rodando = {}
+    inicio_geral = time.perf_counter()
+
+    def rodar(etapa):
+        inicio = time.perf_counter()
+        rss_inicial = None
+        try:
+            rss_inicial = monitor.iniciar(etapa.nome)
+            return etapa.funcao(ctx, resultados)
+        finally:
+            pico = monitor.finalizar(etapa.nome)
+            fim = time.perf_counter()
+            medidas.append({
+                "etapa": etapa.nome,
+                "inicio_s": inicio - inicio_geral,
+                "segundos": fim - inicio,
+                "memoria_inicial_mb": _mb(rss_inicial),
+                "memoria_pico_mb": _mb(pico),
+                "memoria_delta_mb": None if None in (pico, rss_inicial) else _mb(pico - rss_inicial),
+            })
+            memoria = "" if pico is None else f", pico de memória {pico / _MB:,.0f} MB"
+            logging.info(f"⏱️ Etapa '{etapa.nome}': {fim - inicio:.2f}s{memoria}")
+
+    workers = (max_paralelas or MAX_PARALELAS) if paralelo else 1
+    with MonitorMemoria() as monitor, ThreadPoolExecutor(max_workers=workers) as pool:
+        erro = None
+        while pendentes or rodando:
+            if erro is None:
+                prontas = [e for e in pendentes.values()
+                           if all(d in resultados for d in e.dependencias)]
+                for etapa in prontas:
+                    if len(rodando) >= workers or any(e.exclusiva for e in rodando.values()):
+                        break
+                    if etapa.exclusiva and rodando:
+                        continue
+                    del pendentes[etapa.nome]
+                    rodando[pool.submit(rodar, etapa)] = etapa
+            elif not rodando:
+                break
+
+            if not rodando:
+                raise RuntimeError(f"Etapas sem dependências satisfeitas: {', '.join(pendentes)}")
+
+            feitas, _ = wait(rodando, return_when=FIRST_COMPLETED)
+            for futuro in feitas:
+                etapa = rodando.pop(futuro)
+                try:
+                    resultados[etapa.nome] = futuro.result()
+                except Exception as e:
+                    logging.error(f"❌ Erro na etapa '{etapa.nome}': {e}")
+                    erro = erro or e
+
+        if erro is not None:
+            raise erro
+
+    ordem = {e.nome: i for i, e in enumerate(plano)}
+    tempos = pd.DataFrame(medidas).sort_values("etapa", key=lambda s: s.map(ordem)).reset_index(drop=True)
+    return resultados, tempos
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Relatório final em PDF (texto, gráficos PNG e tabelas resumidas).
+"""
+
+import os
+
+from fpdf import FPDF
+from tabulate import tabulate
+
+
+class PDFReport(FPDF):
+    def chapter_title(self, title):
+        self.set_font("Arial", "B", 14)
+        self.set_text_color(0, 0, 128)
+        self.cell(0, 10, title, 0, 1, "L")
+        self.ln(4)
+
+    def chapter_body(self, body_text):
+        self.set_font("Arial", "", 12)
+        self.set_text_color(0, 0, 0)
+        self.multi_cell(0, 8, body_text)
+        self.ln(5)
+
+
+def gerar_relatorio_pdf_completo(resultados_analise, pasta_resultados):
+    pdf = PDFReport()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # Título do relatório
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Relatório Completo de Análise Criminal", 0, 1, "C")
+    pdf.ln(5)
+
+    # Seção de Introdução
+    pdf.chapter_title("Introdução e Importância da Análise")
+    introducao = """A análise de dados criminais é uma ferramenta essencial para o desenvolvimento de estratégias eficazes de segurança pública. Através da identificação de padrões temporais, distribuição geográfica e características dos crimes, é possível:
+
+1. Otimizar a alocação de recursos policiais
+2. Desenvolver políticas preventivas direcionadas
+3. Identificar fatores de risco sociais e ambientais
+4. Medir a eficácia de intervenções realizadas
+5. Prever tendências futuras para ação proativa
+
+Esta análise combina técnicas estatísticas avançadas com visualização de dados intuitiva para transformar dados brutos em insights acionáveis."""
+    pdf.chapter_body(introducao)
+
+    # Seção de Metodologia
+    pdf.chapter_title("Metodologia Científica")
+    metodologia = """Fluxo de Análise:
+1. Coleta de dados de múltiplas fontes
+2. Integração e validação dos datasets
+3. Análise exploratória inicial
+4. Processamento e limpeza dos dados
+5. Modelagem estatística básica
+6. Visualização de padrões relevantes
+7. Interpretação contextualizada dos resultados
+
+Técnicas Utilizadas:
+- Análise de séries temporais
+- Mapeamento de densidade criminal
+- Identificação de outliers estatísticos
+- Análise de correlação espacial"""
+    pdf.chapter_body(metodologia)
+
+    # Inserir gráficos
+    graficos = [
+        ("Distribuição Anual de Crimes", os.path.join(pasta_resultados, "distribuicao_ano.png")),
+        ("Evolução dos Principais Tipos de Crime", os.path.join(pasta_resultados, "tendencia_top_crimes.png")),
+        ("Heatmap de Distribuição de Crimes por Local", os.path.join(pasta_resultados, "heatmap_distribuicao.png")),
+        ("Boxplot da Distribuição de Crimes", os.path.join(pasta_resultados, "boxplot.png")),
+        ("Projeção de Criminalidade até 2030", os.path.join(pasta_resultados, "projecao_crimes.png"))
+    ]
+    # O mapa só existe quando o CSV bruto (com coordenadas) foi usado
+    caminho_mapa = os.path.join(pasta_resultados, "mapa_densidade.png")
+    if os.path.exists(caminho_mapa):
+        graficos.append(("Mapa de Densidade Criminal", caminho_mapa))
+
+    for titulo, caminho_img in graficos:
+        if os.path.exists(caminho_img):
+            pdf.chapter_title(titulo)
+            pdf.image(caminho_img, x=15, w=180)
+            pdf.ln(10)
+        else:
+            pdf.set_font("Arial", "I", 11)
+            pdf.cell(0, 10, f"Gráfico não encontrado: {titulo}", 0, 1)
+            pdf.ln(5)
+
+    # Inserir tabelas resumidas
+    pdf.chapter_title("Tabelas Resumidas")
+
+    def inserir_tabela(df, titulo):
+        if df.empty:
+            return
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 8, titulo, 0, 1)
+        pdf.set_font("Arial", "", 10)
+        tabela_str = tabulate(df.head(10), headers='keys', tablefmt='psql', showindex=False)
+        for linha in tabela_str.split('\n'):
+            pdf.cell(0, 5, linha, ln=1)
+        pdf.ln(5)
+
+    if 'crimes' in resultados_analise and not resultados_analise['crimes'].empty:
+        top_crimes = resultados_analise['crimes'].reset_index()
+        inserir_tabela(top_crimes, "Top 5 Crimes Mais Frequentes")
+
+    if 'locais' in resultados_analise and not resultados_analise['locais'].empty:
+        top_locais = resultados_analise['locais'].reset_index()
+        inserir_tabela(top_locais, "Top 5 Locais com Mais Crimes")
+
+    if 'eficiencia' in resultados_analise and not resultados_analise['eficiencia'].empty:
+        inserir_tabela(resultados_analise['eficiencia'], "Eficiência das Prisões por Região")
+
+    # Fonte dos dados
+    pdf.ln(10)
+    pdf.set_font("Arial", "I", 10)
+    fonte_texto = (
+        "Fonte dos dados: Dados oficiais da polícia, compilados e analisados pelo usuário.\n"
+        "Link da fonte: https://www.kaggle.com/datasets/utkarshx27/crimes\n"
+        "Link da fonte:https://data.cityofchicago.org/browse?sortBy=most_accessed&page=1&pageSize=20\n"
+    )
+    pdf.multi_cell(0, 8, fonte_texto)
+
+    # Salvar PDF
+    arquivo_pdf = os.path.join(pasta_resultados, "Relatorio_Completo.pdf")
+    pdf.output(arquivo_pdf)
+    print(f"\n✅ Relatório PDF completo salvo em: {arquivo_pdf}")
+    return arquivo_pdf
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Renderização paralela e com cache dos gráficos PNG do relatório.
+
+Cada gráfico é descrito por um ``Grafico(nome, funcao, dados, estilo)``.
+``renderizar_graficos`` calcula um hash dos dados, da função de desenho e
+dos parâmetros de estilo; se ele for igual ao da última execução e o PNG
+ainda existir, o gráfico não é desenhado de novo. Os demais são gerados em
+paralelo num pool de processos, cada um com a sua própria ``Figure``.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analise_criminal.cache import atualizar_hash
+
+Grafico = namedtuple("Grafico", ["nome", "funcao", "dados", "estilo"])
+
+# Tema aplicado em cada processo (equivalente ao sns.set_theme do script)
+TEMA = {"style": "darkgrid", "palette": "viridis", "context": "notebook"}
+ESTILO_PADRAO = {"figsize": (12, 6), "dpi": 300}
+
+# Incrementar quando a aparência dos gráficos mudar sem que os dados mudem
+VERSAO_GRAFICOS = "1"
+
+_MANIFESTO = ".graficos_hash.json"
+
+
+def hash_grafico(grafico):
+    h = hashlib.sha256()
+    h.update(f"{VERSAO_GRAFICOS}|{grafico.funcao.__module__}.{grafico.funcao.__qualname__}".encode())
+    h.update(repr(sorted(grafico.estilo.items())).encode())
+    h.update(repr(sorted(TEMA.items())).encode())
+    atualizar_hash(h, grafico.dados)
+    return h.hexdigest()
+
+
+def _desenhar(grafico, caminho):
+    """Executado no processo filho: desenha e salva uma única figura."""
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    inicio = time.perf_counter()
+    estilo = {**ESTILO_PADRAO, **grafico.estilo}
+    figsize, dpi = estilo.pop("figsize"), estilo.pop("dpi")
+
+    with sns.axes_style(TEMA["style"]), sns.plotting_context(TEMA["context"]), \
+            sns.color_palette(TEMA["palette"]):
+        fig = Figure(figsize=figsize)
+        grafico.funcao(fig, grafico.dados, **estilo)
+        fig.tight_layout()
+        fig.savefig(caminho, dpi=dpi)
+    return time.perf_counter() - inicio
+
+
+def _contexto_processos():
+    # Nunca "fork": o processo principal tem outras threads vivas (o pool de
+    # etapas do pipeline e o monitor de memória), e um fork copiaria travas
+    # seguradas por elas. "forkserver" (Linux/macOS) e "spawn" (Windows)
+    # iniciam filhos limpos; as funções de desenho ficam no pacote e o
+    # script principal só executa sob ``if __name__ == "__main__"``, então
+    # os filhos conseguem importá-las sem rodar a análise de novo.
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+
+
+def _ler_manifesto(pasta):
+    try:
+        with open(os.path.join(pasta, _MANIFESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def renderizar_graficos(graficos, pasta, paralelo=True, max_processos=None):
+    """Gera os PNGs de ``graficos`` em ``pasta`` e devolve os tempos.
+
+    O retorno é um DataFrame com ``grafico``, ``caminho``, ``segundos`` e
+    ``situacao`` ("renderizado" ou "cache").
+    """
+    os.makedirs(pasta, exist_ok=True)
+    manifesto = _ler_manifesto(pasta)
+    tempos = []
+    pendentes = []
+
+    for grafico in graficos:
+        caminho = os.path.join(pasta, f"{grafico.nome}.png")
+        assinatura = hash_grafico(grafico)
+        if manifesto.get(grafico.nome) == assinatura and os.path.exists(caminho):
+            tempos.append((grafico.nome, caminho, 0.0, "cache"))
+        else:
+            pendentes.append((grafico, caminho, assinatura))
+
+    if paralelo and len(pendentes) > 1:
+        # Cada filho importa matplotlib/seaborn: não vale abrir mais processos que gráficos
+        processos = min(len(pendentes), max_processos or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=processos, mp_context=_contexto_processos()) as pool:
+            futuros = [pool.submit(_desenhar, g, c) for g, c, _ in pendentes]
+            duracoes = [f.result() for f in futuros]
+    else:
+        duracoes = [_desenhar(g, c) for g, c, _ in pendentes]
+
+    for (grafico, caminho, assinatura), segundos in zip(pendentes, duracoes):
+        manifesto[grafico.nome] = assinatura
+        tempos.append((grafico.nome, caminho, segundos, "renderizado"))
+
+    with open(os.path.join(pasta, _MANIFESTO), "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2)
+
+    ordem = {g.nome: i for i, g in enumerate(graficos)}
+    tempos.sort(key=lambda t: ordem[t[0]])
+    resultado = pd.DataFrame(tempos, columns=["grafico", "caminho", "segundos", "situacao"])
+    for nome, _, segundos, situacao in tempos:
+        logging.info(f"🖼️ {nome}: {situacao} ({segundos:.2f}s)")
+    return resultado
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do pipeline completo com dados sintéticos em escala de Chicago.
+
+Para cada tamanho pedido, gera "Crimes em Chicago.csv" com
+``benchmarks/gerar_dados.py`` e executa o pipeline num processo novo
+(``python -m analise_criminal --sequencial``), medindo tempo e memória
+residente de cada etapa:
+
+    carregar  -> carregar_dados
+    cruzar    -> cruzar_dados (merge / tabela integrada)
+    analisar  -> analise_completa
+    explorar  -> analise_exploratoria
+    projetar  -> gerar_projecao_criminalidade (+ projeção por segmento)
+    exportar  -> exportar_livros (Excel)
+    relatorio -> gerar_relatorio_pdf_completo
+
+As etapas ``espacial`` e ``graficos`` entram como dependências e também são
+medidas. A execução "fria" desliga o cache colunar e apaga os PNGs; com
+``--aquecido`` há também uma execução "quente", com cache já populado.
+A renderização desenha em processos filhos, cuja memória não entra no RSS
+medido.
+
+Os resultados vão para um JSON (``--saida``) com metadados da máquina; com
+``--comparar`` as etapas mais lentas que a referência além da
+``--tolerancia`` são listadas e o script termina com código 1.
+
+Uso:
+    python benchmarks/benchmark_pipeline.py --linhas 10000 1000000 10000000
+    python benchmarks/benchmark_pipeline.py --linhas 1000000 --etapas analisar projetar
+    python benchmarks/benchmark_pipeline.py --linhas 10000 --comparar referencia.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.gerar_dados import gerar_csv  # noqa: E402
+
+TAMANHOS_PADRAO = [10_000, 1_000_000, 10_000_000]
+NOME_CSV = "Crimes em Chicago.csv"
+
+FUNCOES = {
+    "estado": "preparar_estado",
+    "carregar": "carregar_dados",
+    "cruzar": "cruzar_dados",
+    "analisar": "analise_completa",
+    "explorar": "analise_exploratoria",
+    "espacial": "analise_espacial",
+    "projetar": "gerar_projecao_criminalidade",
+    "graficos": "renderizar_graficos",
+    "exportar": "exportar_livros",
+    "relatorio": "gerar_relatorio_pdf_completo",
+}
+
+
+def _versao_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _memoria_total_mb():
+    try:
+        with open("/proc/meminfo") as f:
+            return int(f.readline().split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def metadados():
+    return {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _versao_git(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "memoria_total_mb": _memoria_total_mb(),
+    }
+
+
+def preparar_dados(pasta, linhas, semente):
+    """Gera (ou reaproveita) o CSV sintético com ``linhas`` ocorrências."""
+    pasta_dados = os.path.join(pasta, f"{linhas}")
+    caminho = os.path.join(pasta_dados, NOME_CSV)
+    if os.path.exists(caminho):
+        return pasta_dados, None
+    print(f"🧪 Gerando {linhas:,} linhas sintéticas...")
+    inicio = time.perf_counter()
+    tamanho = gerar_csv(caminho, linhas, semente)
+    return pasta_dados, {"linhas": linhas, "segundos": time.perf_counter() - inicio,
+                         "tamanho_mb": tamanho / 1024 ** 2}
+
+
+def executar_pipeline(pasta_dados, etapas, execucao, registro):
+    """Roda o pipeline num processo novo e devolve os tempos por etapa."""
+    pasta_resultados = os.path.join(pasta_dados, "resultados")
+    if execucao == "frio":
+        shutil.rmtree(pasta_resultados, ignore_errors=True)
+    arquivo_tempos = os.path.join(pasta_dados, f"tempos_{execucao}.json")
+    comando = [
+        sys.executable, "-m", "analise_criminal", *etapas,
+        "--dados", pasta_dados, "--resultados", pasta_resultados,
+        "--sequencial", "--formato-lateral", "nenhum", "--tempos-json", arquivo_tempos,
+    ]
+    if execucao == "frio":
+        comando.append("--sem-cache")
+
+    with open(registro, "a", encoding="utf-8") as log:
+        processo = subprocess.run(comando, cwd=RAIZ, stdout=log, stderr=subprocess.STDOUT,
+                                  env={**os.environ, "MPLBACKEND": "Agg"})
+    if processo.returncode != 0:
+        raise RuntimeError(f"Pipeline falhou (código {processo.returncode}); veja {registro}")
+    with open(arquivo_tempos, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def medir(linhas, pasta, etapas, aquecido, semente):
+    pasta_dados, geracao = preparar_dados(pasta, linhas, semente)
+    registro = os.path.join(pasta_dados, "pipeline.log")
+    execucoes = ["frio"] + (["quente"] if aquecido else [])
+    linhas_resultado = []
+
+    for execucao in execucoes:
+        if execucao == "quente":
+            # Primeira passada com cache só para populá-lo
+            executar_pipeline(pasta_dados, etapas, "aquecimento", registro)
+        print(f"⏱️ {linhas:,} linhas, execução {execucao}...")
+        tempos = executar_pipeline(pasta_dados, etapas, execucao, registro)
+        for etapa in tempos["etapas"]:
+            linhas_resultado.append({
+                "linhas": linhas,
+                "execucao": execucao,
+                "etapa": etapa["etapa"],
+                "funcao": FUNCOES.get(etapa["etapa"], etapa["etapa"]),
+                "segundos": etapa["segundos"],
+                "linhas_por_s": linhas / etapa["segundos"] if etapa["segundos"] > 0 else None,
+                "memoria_inicial_mb": etapa["memoria_inicial_mb"],
+                "memoria_pico_mb": etapa["memoria_pico_mb"],
+                "memoria_delta_mb": etapa["memoria_delta_mb"],
+            })
+        picos = [e["memoria_pico_mb"] for e in tempos["etapas"] if e["memoria_pico_mb"] is not None]
+        linhas_resultado.append({
+            "linhas": linhas, "execucao": execucao, "etapa": "total", "funcao": "pipeline",
+            "segundos": tempos["total_s"], "linhas_por_s": linhas / tempos["total_s"],
+            "memoria_inicial_mb": None,
+            "memoria_pico_mb": max(picos) if picos else None,
+            "memoria_delta_mb": None,
+        })
+    return linhas_resultado, geracao
+
+
+def comparar(atual, referencia, tolerancia):
+    """Etapas em que ``atual`` ficou mais lento que ``referencia`` além da tolerância."""
+    chaves = ["linhas", "execucao", "etapa"]
+    juntos = atual.merge(referencia[chaves + ["segundos", "memoria_pico_mb"]], on=chaves,
+                         suffixes=("", "_referencia"))
+    juntos["razao_tempo"] = juntos["segundos"] / juntos["segundos_referencia"]
+    # Sem medida de memória (None) a razão fica NaN e não acusa regressão
+    juntos["razao_memoria"] = (pd.to_numeric(juntos["memoria_pico_mb"])
+                               / pd.to_numeric(juntos["memoria_pico_mb_referencia"]))
+    # Etapas muito rápidas oscilam demais para servirem de alarme
+    relevantes = juntos["segundos_referencia"] >= 0.05
+    return juntos[relevantes & ((juntos["razao_tempo"] > 1 + tolerancia)
+                                | (juntos["razao_memoria"] > 1 + tolerancia))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--etapas", nargs="*", default=[],
+                        help="etapas do pipeline (padrão: todas; dependências entram automaticamente)")
+    parser.add_argument("--pasta", default=os.path.join(tempfile.gettempdir(), "analise_criminal_benchmark"),
+                        help="onde gerar os CSVs (reaproveitados entre execuções)")
+    parser.add_argument("--aquecido", action="store_true", help="mede também uma execução com cache")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default="benchmark_pipeline.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior usado como referência")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="aumento relativo de tempo/memória considerado regressão (padrão: 0.2)")
+    parser.add_argument("--limpar", action="store_true", help="apaga os CSVs gerados ao final")
+    args = parser.parse_args()
+
+    resultados, geracoes = [], []
+    for linhas in args.linhas:
+        medidas, geracao = medir(linhas, args.pasta, args.etapas, args.aquecido, args.semente)
+        resultados.extend(medidas)
+        if geracao:
+            geracoes.append(geracao)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump({"metadados": metadados(), "geracao": geracoes, "resultados": resultados}, f, indent=2)
+
+    df = pd.DataFrame(resultados)
+    for medida, formato in [("segundos", "{:,.2f}"), ("memoria_pico_mb", "{:,.0f}")]:
+        df[medida] = pd.to_numeric(df[medida])
+        if df[medida].isna().all():
+            continue
+        print(f"\n📊 {medida} por etapa:")
+        tabela = df.pivot_table(index=["execucao", "etapa"], columns="linhas", values=medida, sort=False)
+        print(tabela.to_string(float_format=formato.format))
+    print(f"\n✅ Resultados salvos em: {args.saida}")
+
+    if args.limpar:
+        shutil.rmtree(args.pasta, ignore_errors=True)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            referencia = pd.DataFrame(json.load(f)["resultados"])
+        regressoes = comparar(df, referencia, args.tolerancia)
+        if not regressoes.empty:
+            print(f"\n⚠️ {len(regressoes)} regressões acima de {args.tolerancia:.0%}:")
+            print(regressoes[["linhas", "execucao", "etapa", "segundos", "segundos_referencia",
+                              "razao_tempo", "razao_memoria"]].to_string(index=False, float_format="{:,.2f}".format))
+            return 1
+        print(f"\n✅ Nenhuma regressão acima de {args.tolerancia:.0%} em relação a {args.comparar}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
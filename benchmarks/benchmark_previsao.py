@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: projeção vetorizada x um LinearRegression por série.
+
+Gera séries anuais sintéticas (2001-2025), projeta até 2030 com
+``analise_criminal.previsao.projetar_series`` e com o laço de modelos do
+scikit-learn usado antes no script, confere que as projeções coincidem e
+imprime o throughput (séries por segundo) de cada abordagem.
+
+Uso:
+    python benchmarks/benchmark_previsao.py --series 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise_criminal.previsao import ANO_FINAL, projetar_series  # noqa: E402
+
+
+def gerar_series(n_series, anos=range(2001, 2026), semente=0):
+    rng = np.random.default_rng(semente)
+    anos = np.asarray(list(anos))
+    nivel = rng.uniform(50, 5_000, n_series)
+    tendencia = rng.normal(0, 20, n_series)
+    ruido = rng.normal(0, 30, (n_series, len(anos)))
+    valores = np.clip(nivel[:, None] + tendencia[:, None] * (anos - anos[0]) + ruido, 0, None)
+    return pd.DataFrame({
+        "chave": np.repeat([f"S{i:05d}" for i in range(n_series)], len(anos)),
+        "year": np.tile(anos, n_series),
+        "total_crimes": valores.round().ravel(),
+    })
+
+
+def projetar_sklearn(df):
+    from sklearn.linear_model import LinearRegression
+
+    anos_futuros = np.arange(df["year"].max() + 1, ANO_FINAL + 1).reshape(-1, 1)
+    resultados = []
+    for chave, grupo in df.groupby("chave", sort=True):
+        modelo = LinearRegression()
+        modelo.fit(grupo[["year"]], grupo["total_crimes"])
+        resultados.append(modelo.predict(pd.DataFrame({"year": anos_futuros.ravel()})))
+    return np.vstack(resultados)
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, nargs="+", default=[100, 1_000, 5_000])
+    parser.add_argument("--sem-sklearn", action="store_true",
+                        help="mede só a versão vetorizada (útil para tamanhos grandes)")
+    args = parser.parse_args()
+
+    linhas = []
+    for n in args.series:
+        df = gerar_series(n)
+        vetorizado, t_vet = medir(projetar_series, df, "chave")
+        linha = {"series": n, "vetorizado_s": t_vet, "vetorizado_series_por_s": n / t_vet}
+
+        if not args.sem_sklearn:
+            referencia, t_sk = medir(projetar_sklearn, df)
+            obtido = vetorizado["projecao"].to_numpy().reshape(referencia.shape)
+            linha.update({
+                "sklearn_s": t_sk,
+                "sklearn_series_por_s": n / t_sk,
+                "aceleracao": t_sk / t_vet,
+                # As projeções do motor são cortadas em zero; compara só as positivas
+                "max_diferenca": float(np.abs(obtido - referencia)[referencia > 0].max()),
+            })
+        linhas.append(linha)
+
+    print(pd.DataFrame(linhas).to_string(index=False, float_format=lambda v: f"{v:,.4f}"))
+
+
+if __name__ == "__main__":
+    main()
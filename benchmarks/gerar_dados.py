@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Gerador de dados sintéticos no formato de "Crimes em Chicago.csv".
+
+Produz as mesmas 22 colunas do export do portal (datas "dd/mm/aaaa hh:mm:ss",
+latitude/longitude com vírgula decimal, booleanos TRUE/FALSE) com
+cardinalidades próximas às reais: ~35 tipos de crime com frequências
+assimétricas, algumas centenas de descrições e locais, 50 wards, 77 áreas
+comunitárias, 22 distritos e anos de 2001 a 2025 com tendência de queda.
+As coordenadas se concentram em torno do centro de cada área comunitária,
+para que a grade espacial tenha hotspots, e há uma pequena fração de
+campos ausentes, como no arquivo original.
+
+O arquivo é escrito em blocos, então o consumo de memória não depende do
+número de linhas.
+
+Uso:
+    python benchmarks/gerar_dados.py 1000000 "/tmp/dados/Crimes em Chicago.csv"
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise_criminal.espacial import LIMITES_CHICAGO  # noqa: E402
+
+BLOCO_LINHAS = 500_000
+
+COLUNAS = [
+    "unique_key", "case_number", "date", "block", "iucr", "primary_type", "description",
+    "location_description", "arrest", "domestic", "beat", "district", "ward",
+    "community_area", "fbi_code", "x_coordinate", "y_coordinate", "year", "updated_on",
+    "latitude", "longitude", "location",
+]
+
+# (tipo, participação aproximada no histórico, taxa de prisão, taxa doméstica)
+TIPOS = [
+    ("THEFT", 0.210, 0.11, 0.05), ("BATTERY", 0.182, 0.22, 0.45),
+    ("CRIMINAL DAMAGE", 0.114, 0.07, 0.15), ("NARCOTICS", 0.095, 0.99, 0.00),
+    ("ASSAULT", 0.066, 0.21, 0.25), ("OTHER OFFENSE", 0.062, 0.17, 0.30),
+    ("BURGLARY", 0.054, 0.06, 0.02), ("MOTOR VEHICLE THEFT", 0.047, 0.08, 0.01),
+    ("DECEPTIVE PRACTICE", 0.044, 0.12, 0.02), ("ROBBERY", 0.037, 0.09, 0.02),
+    ("CRIMINAL TRESPASS", 0.028, 0.70, 0.05), ("WEAPONS VIOLATION", 0.013, 0.80, 0.01),
+    ("PROSTITUTION", 0.009, 0.99, 0.00), ("PUBLIC PEACE VIOLATION", 0.007, 0.60, 0.03),
+    ("OFFENSE INVOLVING CHILDREN", 0.007, 0.17, 0.40), ("CRIM SEXUAL ASSAULT", 0.004, 0.15, 0.20),
+    ("SEX OFFENSE", 0.004, 0.30, 0.15), ("INTERFERENCE WITH PUBLIC OFFICER", 0.002, 0.95, 0.00),
+    ("GAMBLING", 0.002, 0.99, 0.00), ("LIQUOR LAW VIOLATION", 0.002, 0.99, 0.00),
+    ("ARSON", 0.0017, 0.10, 0.05), ("HOMICIDE", 0.0015, 0.45, 0.05),
+    ("KIDNAPPING", 0.0009, 0.10, 0.30), ("CRIMINAL SEXUAL ASSAULT", 0.0008, 0.10, 0.20),
+    ("INTIMIDATION", 0.0006, 0.15, 0.10), ("STALKING", 0.0006, 0.10, 0.40),
+    ("CONCEALED CARRY LICENSE VIOLATION", 0.0001, 0.90, 0.00), ("OBSCENITY", 0.0001, 0.60, 0.05),
+    ("PUBLIC INDECENCY", 0.0001, 0.95, 0.00), ("NON-CRIMINAL", 0.00005, 0.02, 0.00),
+    ("HUMAN TRAFFICKING", 0.00003, 0.10, 0.00), ("OTHER NARCOTIC VIOLATION", 0.00002, 0.80, 0.00),
+    ("RITUALISM", 0.00001, 0.10, 0.00), ("NON - CRIMINAL", 0.00001, 0.02, 0.00),
+    ("DOMESTIC VIOLENCE", 0.00001, 0.50, 1.00),
+]
+
+LOCAIS_COMUNS = [
+    "STREET", "RESIDENCE", "APARTMENT", "SIDEWALK", "OTHER", "PARKING LOT/GARAGE(NON.RESID.)",
+    "ALLEY", "SCHOOL, PUBLIC, BUILDING", "RESIDENCE-GARAGE", "RESIDENCE PORCH/HALLWAY",
+    "SMALL RETAIL STORE", "RESTAURANT", "GROCERY FOOD STORE", "DEPARTMENT STORE",
+    "VEHICLE NON-COMMERCIAL", "RESIDENTIAL YARD (FRONT/BACK)", "GAS STATION",
+    "CHA PARKING LOT/GROUNDS", "PARK PROPERTY", "COMMERCIAL / BUSINESS OFFICE",
+    "CTA PLATFORM", "BAR OR TAVERN", "CHA APARTMENT", "DRUG STORE", "BANK",
+    "HOTEL/MOTEL", "HOTEL / MOTEL", "CTA TRAIN", "CTA BUS", "HOSPITAL BUILDING/GROUNDS",
+]
+N_LOCAIS = 180
+N_AREAS = 77
+N_WARDS = 50
+DISTRITOS = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 15, 16, 17, 18, 19, 20, 22, 24, 25])
+ANOS = np.arange(2001, 2026)
+RUAS = ["STATE ST", "MICHIGAN AVE", "HALSTED ST", "ASHLAND AVE", "WESTERN AVE", "PULASKI RD",
+        "CICERO AVE", "KEDZIE AVE", "CHICAGO AVE", "MADISON ST", "ROOSEVELT RD", "CERMAK RD",
+        "NORTH AVE", "FULLERTON AVE", "BELMONT AVE", "IRVING PARK RD", "LAWRENCE AVE",
+        "79TH ST", "63RD ST", "47TH ST", "WACKER DR", "LAKE ST", "DIVISION ST", "GARFIELD BLVD"]
+
+_DOIS_DIGITOS = np.array([f"{i:02d}" for i in range(100)], dtype=object)
+
+
+def _zipf(n, expoente=1.1):
+    pesos = 1.0 / np.arange(1, n + 1) ** expoente
+    return pesos / pesos.sum()
+
+
+class Vocabulario:
+    """Valores possíveis de cada coluna e as suas probabilidades (fixos pela semente)."""
+
+    def __init__(self, semente=0):
+        rng = np.random.default_rng(semente)
+        self.tipos = np.array([t[0] for t in TIPOS], dtype=object)
+        pesos = np.array([t[1] for t in TIPOS])
+        self.p_tipos = pesos / pesos.sum()
+        self.p_prisao = np.array([t[2] for t in TIPOS])
+        self.p_domestico = np.array([t[3] for t in TIPOS])
+
+        # Descrições: proporcionais ao volume do tipo (~400 no total)
+        self.descricoes, self.p_descricoes = [], []
+        for tipo, participacao, _, _ in TIPOS:
+            n = int(np.clip(round(participacao * 300), 2, 60))
+            self.descricoes.append(np.array([f"{tipo} - CATEGORIA {i:02d}" for i in range(1, n + 1)],
+                                            dtype=object))
+            self.p_descricoes.append(_zipf(n))
+        self.iucr = np.array([f"{0x100 + 0x40 * i:04X}"[-4:] for i in range(len(TIPOS))], dtype=object)
+        self.fbi = np.array([f"{(i % 26) + 1:02d}" for i in range(len(TIPOS))], dtype=object)
+
+        extras = [f"LOCAL {i:03d}" for i in range(len(LOCAIS_COMUNS), N_LOCAIS)]
+        self.locais = np.array(LOCAIS_COMUNS + extras, dtype=object)
+        self.p_locais = _zipf(N_LOCAIS, 1.3)
+
+        # Volume anual caindo ~40% entre 2001 e 2025 (com o vale da pandemia)
+        volume = np.linspace(1.0, 0.6, len(ANOS))
+        volume[ANOS == 2020] *= 0.8
+        self.p_anos = volume / volume.sum()
+
+        # Cada área comunitária tem um centro, um ward e um distrito
+        lat = rng.uniform(LIMITES_CHICAGO["lat_min"] + 0.05, LIMITES_CHICAGO["lat_max"] - 0.03, N_AREAS)
+        lon = rng.uniform(LIMITES_CHICAGO["lon_min"] + 0.10, LIMITES_CHICAGO["lon_max"] - 0.02, N_AREAS)
+        self.centros = np.column_stack([lat, lon])
+        self.p_areas = rng.dirichlet(np.full(N_AREAS, 2.0))
+        # Todos os wards aparecem; alguns cobrem mais de uma área
+        self.ward_area = rng.permutation(np.resize(np.arange(1, N_WARDS + 1), N_AREAS))
+        self.distrito_area = rng.choice(DISTRITOS, N_AREAS)
+
+
+def gerar_bloco(vocabulario, linhas, inicio_chave, rng):
+    """Um DataFrame com ``linhas`` ocorrências sintéticas, já como texto do CSV."""
+    v = vocabulario
+    i_tipo = rng.choice(len(v.tipos), linhas, p=v.p_tipos)
+    descricao = np.empty(linhas, dtype=object)
+    for i in np.unique(i_tipo):
+        selecao = i_tipo == i
+        descricao[selecao] = rng.choice(v.descricoes[i], selecao.sum(), p=v.p_descricoes[i])
+
+    i_area = rng.choice(N_AREAS, linhas, p=v.p_areas)
+    lat = v.centros[i_area, 0] + rng.normal(0, 0.012, linhas)
+    lon = v.centros[i_area, 1] + rng.normal(0, 0.015, linhas)
+
+    ano = rng.choice(ANOS, linhas, p=v.p_anos)
+    dia_ano = rng.integers(0, 365, linhas)
+    segundos = rng.integers(0, 86_400, linhas)
+    data = (ano - 1970).astype("datetime64[Y]").astype("datetime64[D]") + dia_ano.astype("timedelta64[D]")
+    atualizado = data + rng.integers(1, 400, linhas).astype("timedelta64[D]")
+
+    def formatar(dias, segs):
+        d = pd.DatetimeIndex(dias)
+        hora, resto = np.divmod(segs, 3600)
+        minuto, segundo = np.divmod(resto, 60)
+        return (_DOIS_DIGITOS[d.day] + "/" + _DOIS_DIGITOS[d.month] + "/" + d.year.astype(str).to_numpy(dtype=object)
+                + " " + _DOIS_DIGITOS[hora] + ":" + _DOIS_DIGITOS[minuto] + ":" + _DOIS_DIGITOS[segundo])
+
+    distrito = v.distrito_area[i_area]
+    beat = distrito * 100 + rng.integers(1, 35, linhas)
+    ward = v.ward_area[i_area].astype(float)
+    area = (i_area + 1).astype(float)
+    local = rng.choice(v.locais, linhas, p=v.p_locais)
+
+    # Campos ausentes, em proporções parecidas com as do export real
+    sem_coordenada = rng.random(linhas) < 0.01
+    lat[sem_coordenada] = np.nan
+    lon[sem_coordenada] = np.nan
+    ward[rng.random(linhas) < 0.005] = np.nan
+    area[rng.random(linhas) < 0.005] = np.nan
+    local[rng.random(linhas) < 0.002] = None
+
+    texto_lat = pd.Series(lat).map("{:.8f}".format, na_action="ignore")
+    texto_lon = pd.Series(lon).map("{:.8f}".format, na_action="ignore")
+    localizacao = "(" + texto_lat + ", " + texto_lon + ")"
+    numero = rng.integers(0, 120, linhas) * 100
+
+    return pd.DataFrame({
+        "unique_key": np.arange(inicio_chave, inicio_chave + linhas),
+        "case_number": "J" + pd.Series(rng.integers(100_000, 999_999, linhas)).astype(str),
+        "date": formatar(data, segundos),
+        "block": (pd.Series(numero).map("{:05d}".format).str[:3] + "XX "
+                  + rng.choice(["N", "S", "E", "W"], linhas) + " " + rng.choice(RUAS, linhas)),
+        "iucr": v.iucr[i_tipo],
+        "primary_type": v.tipos[i_tipo],
+        "description": descricao,
+        "location_description": local,
+        "arrest": np.where(rng.random(linhas) < v.p_prisao[i_tipo], "TRUE", "FALSE"),
+        "domestic": np.where(rng.random(linhas) < v.p_domestico[i_tipo], "TRUE", "FALSE"),
+        "beat": beat,
+        "district": distrito,
+        "ward": pd.array(ward, dtype="Int64"),
+        "community_area": pd.array(area, dtype="Int64"),
+        "fbi_code": v.fbi[i_tipo],
+        "x_coordinate": pd.array(np.round((lon + 87.9) * 82_000 + 1_100_000), dtype="Int64"),
+        "y_coordinate": pd.array(np.round((lat - 41.6) * 364_000 + 1_800_000), dtype="Int64"),
+        "year": ano,
+        "updated_on": formatar(atualizado, rng.integers(0, 86_400, linhas)),
+        # Vírgula como separador decimal, como no export original
+        "latitude": texto_lat.str.replace(".", ",", regex=False),
+        "longitude": texto_lon.str.replace(".", ",", regex=False),
+        "location": localizacao,
+    }, columns=COLUNAS)
+
+
+def gerar_csv(caminho, linhas, semente=0, bloco_linhas=BLOCO_LINHAS):
+    """Escreve ``linhas`` ocorrências sintéticas em ``caminho``; devolve o tamanho em bytes."""
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    vocabulario = Vocabulario(semente)
+    rng = np.random.default_rng(semente + 1)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8", newline="") as f:
+        for inicio in range(0, linhas, bloco_linhas):
+            n = min(bloco_linhas, linhas - inicio)
+            bloco = gerar_bloco(vocabulario, n, 10_000_000 + inicio, rng)
+            bloco.to_csv(f, index=False, header=inicio == 0)
+    os.replace(temporario, caminho)
+    return os.path.getsize(caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("linhas", type=int)
+    parser.add_argument("caminho")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    tamanho = gerar_csv(args.caminho, args.linhas, args.semente)
+    print(f"✅ {args.linhas:,} linhas ({tamanho / 1024 ** 2:,.1f} MB) em "
+          f"{time.perf_counter() - inicio:.1f}s: {args.caminho}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Conferência do modo incremental: carga inicial + delta == recarga completa.
+
+Gera um histórico sintético com ``benchmarks/gerar_dados.py`` e um export
+diário com registros reenviados (tipo, prisão, área e coordenadas
+alterados), registros novos e registros antigos que a marca d'água deve
+ignorar. Compara os agregados, as séries anuais por segmento e a densidade
+da grade espacial do ``EstadoIncremental`` com os obtidos relendo do zero o
+CSV já com o delta aplicado, e mede o tempo de cada caminho.
+
+Também simula uma queda no meio de ``atualizar``, antes e depois do ponto
+de confirmação no ``estado.json``, e confere que reabrir o estado e
+reaplicar o delta não conta nada em dobro.
+
+Uso:
+    python benchmarks/verificar_incremental.py --linhas 50000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise_criminal.espacial import carregar_pontos_csv, contar_celulas  # noqa: E402
+from analise_criminal.incremental import EstadoIncremental  # noqa: E402
+from analise_criminal.ingestao import carregar_dados_csv, carregar_series_anuais  # noqa: E402
+from benchmarks.gerar_dados import Vocabulario, gerar_bloco, gerar_csv  # noqa: E402
+
+# Posterior a qualquer updated_on do gerador
+ATUALIZADO_EM = "01/01/2031 00:00:00"
+
+
+def gerar_delta(historico, n_novos, semente):
+    """Export diário e CSV completo equivalente (histórico com o delta aplicado)."""
+    rng = np.random.default_rng(semente)
+    n = len(historico)
+    reenviados = historico.iloc[rng.choice(n, max(1, n // 100), replace=False)].copy()
+    reenviados["primary_type"] = "THEFT"
+    reenviados["arrest"] = np.where(reenviados["arrest"] == "TRUE", "FALSE", "TRUE")
+    reenviados["community_area"] = "32"
+    reenviados["latitude"] = "41,88100000"
+    reenviados["longitude"] = "-87,63000000"
+    reenviados["updated_on"] = ATUALIZADO_EM
+
+    # Chaves novas a partir da faixa seguinte, como nos exports reais
+    inicio = int(historico["unique_key"].astype("int64").max()) + 1
+    novos = gerar_bloco(Vocabulario(semente), n_novos, inicio, rng).astype(str)
+    novos = novos.replace({"nan": "", "<NA>": "", "None": ""})
+    novos["updated_on"] = ATUALIZADO_EM
+
+    # Versões antigas, abaixo da marca d'água: devem ser ignoradas
+    antigos = historico.iloc[rng.choice(n, max(1, n // 200), replace=False)].copy()
+    antigos["primary_type"] = "IGNORAR"
+
+    delta = pd.concat([reenviados, novos, antigos], ignore_index=True)
+    completo = pd.concat([historico[~historico["unique_key"].isin(reenviados["unique_key"])],
+                          reenviados, novos], ignore_index=True)
+    return delta, completo
+
+
+def _ordenado(df):
+    df = df.copy()
+    for coluna in df.columns:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype(str)
+    chaves = [c for c in df.columns if c not in ("total", "total_crimes")]
+    return df.sort_values(chaves, kind="stable").reset_index(drop=True)
+
+
+def conferir(estado, esperado, total_registros):
+    """Nomes dos resultados do estado que diferem de ``esperado``."""
+    obtido = dict(zip(["df_ano", "df_bairro", "df_local"], estado.agregados()))
+    obtido["series_anuais"] = estado.series_anuais()
+    obtido["densidade_espacial"] = estado.densidade_espacial()
+    divergentes = []
+    for nome, df in esperado.items():
+        try:
+            pd.testing.assert_frame_equal(_ordenado(df), _ordenado(obtido[nome]), check_dtype=False)
+        except AssertionError as erro:
+            print(f"❌ {nome} diverge da recarga completa:\n{erro}")
+            divergentes.append(nome)
+    if estado.total_registros != total_registros:
+        print(f"❌ total_registros: {estado.total_registros} no estado, {total_registros} no CSV completo")
+        divergentes.append("total_registros")
+    return divergentes
+
+
+class QuedaSimulada(Exception):
+    pass
+
+
+def simular_queda(pasta, caminho_historico, caminho_delta, metodo):
+    """Interrompe ``atualizar`` em ``metodo``, reabre o estado e reaplica o delta."""
+    estado = EstadoIncremental(pasta)
+    estado.inicializar(caminho_historico)
+
+    def cair(*args, **kwargs):
+        raise QuedaSimulada(metodo)
+
+    setattr(estado, metodo, cair)
+    try:
+        estado.atualizar(caminho_delta)
+    except QuedaSimulada:
+        pass
+    estado = EstadoIncremental(pasta)
+    estado.atualizar(caminho_delta)
+    return estado
+
+
+def medir(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=50_000, help="tamanho do histórico")
+    parser.add_argument("--novos", type=int, default=2_000, help="registros novos no delta")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="verificar_incremental_")
+    try:
+        caminho_historico = os.path.join(pasta, "historico.csv")
+        caminho_delta = os.path.join(pasta, "novos.csv")
+        caminho_completo = os.path.join(pasta, "completo.csv")
+        gerar_csv(caminho_historico, args.linhas, args.semente)
+        historico = pd.read_csv(caminho_historico, dtype=str, keep_default_na=False)
+        delta, completo = gerar_delta(historico, args.novos, args.semente + 1)
+        delta.to_csv(caminho_delta, index=False)
+        completo.to_csv(caminho_completo, index=False)
+
+        def recarregar():
+            df_ano, df_bairro, df_local = carregar_dados_csv(caminho_completo)
+            return {"df_ano": df_ano, "df_bairro": df_bairro, "df_local": df_local,
+                    "series_anuais": carregar_series_anuais(caminho_completo),
+                    "densidade_espacial": contar_celulas(carregar_pontos_csv(caminho_completo)).reset_index()}
+
+        esperado, t_completo = medir(recarregar)
+        estado = EstadoIncremental(os.path.join(pasta, "estado"))
+        _, t_inicial = medir(estado.inicializar, caminho_historico)
+        _, t_delta = medir(estado.atualizar, caminho_delta)
+        print(pd.DataFrame([
+            {"caminho": "recarga completa", "linhas": len(completo), "segundos": t_completo},
+            {"caminho": "carga inicial", "linhas": len(historico), "segundos": t_inicial},
+            {"caminho": "delta", "linhas": len(delta), "segundos": t_delta},
+        ]).to_string(index=False, float_format="{:,.2f}".format))
+
+        divergentes = conferir(estado, esperado, len(completo))
+        for metodo in ["_confirmar", "_aplicar_pendentes"]:
+            print(f"💥 Queda simulada em {metodo}...")
+            estado = simular_queda(os.path.join(pasta, f"queda{metodo}"), caminho_historico,
+                                   caminho_delta, metodo)
+            divergentes += [f"{nome} (queda em {metodo})"
+                            for nome in conferir(estado, esperado, len(completo))]
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    if divergentes:
+        print(f"\n⚠️ Divergências: {', '.join(divergentes)}")
+        return 1
+    print("\n✅ Carga inicial + delta coincide com a recarga completa")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())